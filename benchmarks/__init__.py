@@ -0,0 +1,36 @@
+"""
+Micro-benchmarks of PicoGo hot paths.
+
+On the Pico, copy this package alongside the contents of src and run:
+
+    import benchmarks
+    benchmarks.main()
+
+On a host, run ``python -m benchmarks`` from the repository root, which
+uses simulated peripherals from the sim directory.
+"""
+
+import sys
+
+HOST = sys.implementation.name != "micropython"
+
+if HOST:
+    import os
+
+    _root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for _path in ("src", "sim"):
+        _path = os.path.join(_root, _path)
+        if _path not in sys.path:
+            sys.path.insert(0, _path)
+
+
+def main(names: list[str] | None = None, iterations: int | None = None) -> dict:
+    """Run benchmarks, print report as JSON and return it."""
+    import ujson
+
+    from benchmarks import cases  # noqa: F401
+    from benchmarks.harness import run
+
+    report = run(names, iterations)
+    print(ujson.dumps(report))
+    return report
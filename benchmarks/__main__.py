@@ -0,0 +1,38 @@
+"""Run benchmarks on a host with simulated peripherals."""
+
+import argparse
+import json
+import sys
+
+import benchmarks  # noqa: F401  # sets up paths
+from benchmarks import cases  # noqa: F401
+from benchmarks.harness import compare, run
+
+
+def main() -> int:
+    """Run benchmarks, returning non-zero exit status on regressions."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("names", nargs="*", help="benchmark names or prefixes")
+    parser.add_argument("-n", "--iterations", type=int, help="override iterations")
+    parser.add_argument("-o", "--output", help="write report to file")
+    parser.add_argument("-b", "--baseline", help="compare against baseline report")
+    parser.add_argument(
+        "-t", "--tolerance", type=float, default=0.2, help="allowed slowdown ratio"
+    )
+    args = parser.parse_args()
+
+    report = run(args.names, args.iterations)
+    if args.baseline:
+        with open(args.baseline) as file:
+            report["comparison"] = compare(report, json.load(file), args.tolerance)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    print(output)
+    return 1 if report.get("comparison", {}).get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
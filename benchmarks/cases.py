@@ -0,0 +1,197 @@
+"""Benchmarks of PicoGo hot paths, registered on import."""
+
+from benchmarks import HOST
+from benchmarks.harness import benchmark
+from board import Board
+from bluetooth import Bluetooth
+from colour import Colours, convert_rgb888, swap_bytes
+from motor import DriveState
+from remote import Key
+from tracking import Tracking
+
+if HOST:
+    import peripherals
+
+    peripherals.reset()
+    peripherals.sonar(200)
+    peripherals.tracking([100, 300, 900, 300, 100])
+
+board = Board()
+tracking = Tracking()
+values = [0] * len(tracking.sensors)
+bluetooth = Bluetooth()
+command = b'{"drive": "stop", "speed": 50}'
+
+
+def _loopback() -> callable:
+    """
+    Make the Bluetooth instance read commands without a connected client.
+
+    Return function which makes a command available to read.
+    """
+    state = {"pending": False}
+
+    def any():
+        return len(command) if state["pending"] else 0
+
+    def readinto(buffer, nbytes=None):
+        buffer[: len(command)] = command
+        state["pending"] = False
+        return len(command)
+
+    def send():
+        state["pending"] = True
+
+    bluetooth.any = any
+    bluetooth.readinto = readinto
+    return send
+
+
+send = _loopback()
+
+
+# Tracking
+
+
+@benchmark("tracking.analog_read", repeat=10)
+def tracking_analog_read():
+    tracking.analog_read()
+
+
+@benchmark("tracking.analog_read.preallocated", repeat=10)
+def tracking_analog_read_preallocated():
+    tracking.analog_read(values)
+
+
+@benchmark("tracking.read_calibrated", repeat=10)
+def tracking_read_calibrated():
+    tracking.read_calibrated()
+
+
+@benchmark("tracking.read_line", repeat=10)
+def tracking_read_line():
+    tracking.read_line()
+
+
+def _adaptive() -> None:
+    """Scan only around the line, as when tracking reliably."""
+    tracking.adaptive = True
+
+
+@benchmark("tracking.read_line.adaptive", repeat=10, setup=_adaptive)
+def tracking_read_line_adaptive():
+    tracking.read_line(False, values)
+
+
+# Remote
+
+
+@benchmark("remote.get_key.idle", repeat=10)
+def remote_get_key_idle():
+    board.remote.get_key()
+
+
+if HOST:
+
+    @benchmark(
+        "remote.get_key.frame",
+        iterations=5,
+        setup=lambda: peripherals.remote(Key.NUMBER_5),
+    )
+    def remote_get_key_frame():
+        board.remote.get_key()
+
+
+# Bluetooth
+
+
+@benchmark("bluetooth.callback", repeat=10)
+def bluetooth_callback():
+    send()
+    bluetooth.callback(board)
+
+
+# Display
+
+
+@benchmark("display.show", iterations=20)
+def display_show():
+    board.display.show()
+
+
+@benchmark("display.text", iterations=20)
+def display_text():
+    board.display.text("Battery: 100.0% (4.2V)", 5, 5, 0xFFFF)
+
+
+@benchmark("display.draw_text.cached", iterations=20)
+def display_draw_text_cached():
+    board.display.draw_text("Battery: 100.0% (4.2V)", 5, 5)
+
+
+@benchmark("display.draw_text.large", iterations=20)
+def display_draw_text_large():
+    board.display.draw_text("Forwards 50%", 5, 5, size=16)
+
+
+# Drive
+
+
+@benchmark("drive.forward", repeat=10)
+def drive_forward():
+    board.drive.forward()
+
+
+@benchmark("drive.stop", repeat=10)
+def drive_stop():
+    board.drive.stop()
+
+
+@benchmark("drive.state", repeat=10)
+def drive_state():
+    board.drive.state == DriveState.FORWARD
+
+
+@benchmark("drive.speed", repeat=10)
+def drive_speed():
+    board.drive.speed = 50
+
+
+# Colour
+
+
+@benchmark("colour.rgb565", repeat=100)
+def colour_rgb565():
+    Colours.ORANGE.rgb565
+
+
+@benchmark("colour.rgb_24bit", repeat=100)
+def colour_rgb_24bit():
+    Colours.ORANGE.rgb_24bit
+
+
+@benchmark("colour.native", repeat=100)
+def colour_native():
+    Colours.ORANGE.native
+
+
+ROW_RGB888 = bytearray(240 * 3)
+ROW_NATIVE = bytearray(240 * 2)
+
+
+@benchmark("colour.convert_rgb888")
+def colour_convert_rgb888():
+    convert_rgb888(ROW_RGB888, ROW_NATIVE, 240)
+
+
+@benchmark("colour.swap_bytes")
+def colour_swap_bytes():
+    swap_bytes(ROW_NATIVE, 240)
+
+
+# Board
+
+
+@benchmark("board.display_information", iterations=10)
+def board_display_information():
+    board.display_information()
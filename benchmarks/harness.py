@@ -0,0 +1,97 @@
+import sys
+
+import utime
+
+BENCHMARKS = []
+
+
+class Benchmark:
+    """Operation timed over a number of iterations, each repeating it."""
+
+    def __init__(
+        self,
+        name: str,
+        function: callable,
+        iterations: int = 100,
+        repeat: int = 1,
+        setup: callable = None,
+    ) -> None:
+        """Initialise benchmark instance."""
+        self.name = name
+        self.function = function
+        self.iterations = iterations
+        self.repeat = repeat
+        self.setup = setup
+
+    def measure(self, iterations: int | None = None) -> dict:
+        """Return statistics of time per call in microseconds."""
+        iterations = iterations or self.iterations
+        function = self.function
+        samples = []
+        for _ in range(iterations):
+            if self.setup is not None:
+                self.setup()
+            start = utime.ticks_us()
+            for _ in range(self.repeat):
+                function()
+            samples.append(utime.ticks_diff(utime.ticks_us(), start) / self.repeat)
+        samples.sort()
+        return {
+            "iterations": iterations,
+            "repeat": self.repeat,
+            "min": round(samples[0], 2),
+            "median": round(samples[len(samples) // 2], 2),
+            "mean": round(sum(samples) / len(samples), 2),
+            "p99": round(samples[min(len(samples) - 1, len(samples) * 99 // 100)], 2),
+            "max": round(samples[-1], 2),
+        }
+
+
+def benchmark(
+    name: str, iterations: int = 100, repeat: int = 1, setup: callable = None
+) -> callable:
+    """Register decorated function as a benchmark."""
+
+    def register(function: callable) -> callable:
+        BENCHMARKS.append(Benchmark(name, function, iterations, repeat, setup))
+        return function
+
+    return register
+
+
+def run(names: list[str] | None = None, iterations: int | None = None) -> dict:
+    """
+    Run registered benchmarks and return report.
+
+    Benchmarks are selected by name or prefix, e.g. "tracking".
+    """
+    results = {}
+    for bench in BENCHMARKS:
+        if names and not any(bench.name.startswith(name) for name in names):
+            continue
+        results[bench.name] = bench.measure(iterations)
+    return {
+        "implementation": sys.implementation.name,
+        "platform": sys.platform,
+        "results": results,
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float = 0.2) -> dict:
+    """
+    Return ratio of median times against baseline for each benchmark.
+
+    Ratios above 1 + tolerance are regressions.
+    """
+    ratios = {}
+    for name, result in report["results"].items():
+        reference = baseline["results"].get(name)
+        if reference is None or not reference["median"]:
+            continue
+        ratios[name] = round(result["median"] / reference["median"], 3)
+    return {
+        "ratios": ratios,
+        "regressions": [
+            name for name, ratio in ratios.items() if ratio > 1 + tolerance
+        ],
+    }
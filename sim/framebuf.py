@@ -0,0 +1,156 @@
+"""
+Host implementation of MicroPython's framebuf module.
+
+Text is drawn with placeholder glyphs, which are distinct per character
+but do not match the firmware's 8x8 font.
+"""
+
+MONO_VLSB = 0
+MVLSB = MONO_VLSB
+RGB565 = 1
+GS4_HMSB = 2
+MONO_HLSB = 3
+MONO_HMSB = 4
+GS2_HMSB = 5
+GS8 = 6
+
+
+def _glyph(character: str) -> list[int]:
+    """Return 8 rows of placeholder glyph for character."""
+    code = ord(character)
+    if code == 0x20:
+        return [0] * 8
+    seed = (code * 2654435761) & 0xFFFFFFFF
+    rows = [0]
+    for row in range(6):
+        rows.append(((seed >> (row * 5)) & 0x1F) << 2 | 0x40)
+    rows.append(0)
+    return rows
+
+
+class FrameBuffer:
+    def __init__(
+        self, buffer, width: int, height: int, format: int, stride: int | None = None
+    ) -> None:
+        self.buffer = memoryview(buffer).cast("B")
+        self.width = width
+        self.height = height
+        self.format = format
+        self.stride = width if stride is None else stride
+        if format == RGB565:
+            required = self.stride * height * 2
+        elif format == GS8:
+            required = self.stride * height
+        elif format == MONO_VLSB:
+            required = ((height + 7) // 8) * self.stride
+        elif format in (MONO_HLSB, MONO_HMSB):
+            required = ((self.stride + 7) // 8) * height
+        else:
+            raise ValueError("Unsupported format")
+        if len(self.buffer) < required:
+            raise ValueError("Buffer too small")
+
+    def _get(self, x: int, y: int) -> int:
+        if self.format == RGB565:
+            index = (y * self.stride + x) * 2
+            return self.buffer[index] | (self.buffer[index + 1] << 8)
+        if self.format == GS8:
+            return self.buffer[y * self.stride + x]
+        if self.format == MONO_VLSB:
+            return (self.buffer[(y >> 3) * self.stride + x] >> (y & 7)) & 1
+        index = y * ((self.stride + 7) // 8) + (x >> 3)
+        shift = 7 - (x & 7) if self.format == MONO_HLSB else x & 7
+        return (self.buffer[index] >> shift) & 1
+
+    def _set(self, x: int, y: int, colour: int) -> None:
+        if self.format == RGB565:
+            index = (y * self.stride + x) * 2
+            self.buffer[index] = colour & 0xFF
+            self.buffer[index + 1] = (colour >> 8) & 0xFF
+            return
+        if self.format == GS8:
+            self.buffer[y * self.stride + x] = colour & 0xFF
+            return
+        if self.format == MONO_VLSB:
+            index = (y >> 3) * self.stride + x
+            mask = 1 << (y & 7)
+        else:
+            index = y * ((self.stride + 7) // 8) + (x >> 3)
+            mask = 1 << (7 - (x & 7) if self.format == MONO_HLSB else x & 7)
+        if colour & 1:
+            self.buffer[index] |= mask
+        else:
+            self.buffer[index] &= ~mask & 0xFF
+
+    def pixel(self, x: int, y: int, colour: int | None = None):
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        if colour is None:
+            return self._get(x, y)
+        self._set(x, y, colour)
+        return None
+
+    def fill(self, colour: int) -> None:
+        if self.format == RGB565 and self.stride == self.width:
+            pattern = bytes((colour & 0xFF, (colour >> 8) & 0xFF))
+            size = self.width * self.height * 2
+            self.buffer[:size] = pattern * (size // 2)
+            return
+        self.fill_rect(0, 0, self.width, self.height, colour)
+
+    def fill_rect(self, x: int, y: int, w: int, h: int, colour: int) -> None:
+        for row in range(max(0, y), min(self.height, y + h)):
+            for column in range(max(0, x), min(self.width, x + w)):
+                self._set(column, row, colour)
+
+    def rect(self, x: int, y: int, w: int, h: int, colour: int, fill: bool = False):
+        if fill:
+            self.fill_rect(x, y, w, h, colour)
+            return
+        self.hline(x, y, w, colour)
+        self.hline(x, y + h - 1, w, colour)
+        self.vline(x, y, h, colour)
+        self.vline(x + w - 1, y, h, colour)
+
+    def hline(self, x: int, y: int, w: int, colour: int) -> None:
+        self.fill_rect(x, y, w, 1, colour)
+
+    def vline(self, x: int, y: int, h: int, colour: int) -> None:
+        self.fill_rect(x, y, 1, h, colour)
+
+    def line(self, x1: int, y1: int, x2: int, y2: int, colour: int) -> None:
+        steps = max(abs(x2 - x1), abs(y2 - y1), 1)
+        for step in range(steps + 1):
+            self.pixel(
+                round(x1 + (x2 - x1) * step / steps),
+                round(y1 + (y2 - y1) * step / steps),
+                colour,
+            )
+
+    def text(self, string: str, x: int, y: int, colour: int = 1) -> None:
+        for index, character in enumerate(string):
+            for row, bits in enumerate(_glyph(character)):
+                for column in range(8):
+                    if bits & (0x80 >> column):
+                        self.pixel(x + index * 8 + column, y + row, colour)
+
+    def blit(self, source, x: int, y: int, key: int = -1, palette=None) -> None:
+        if isinstance(source, tuple):
+            source = FrameBuffer(*source)
+        for row in range(source.height):
+            if not 0 <= y + row < self.height:
+                continue
+            for column in range(source.width):
+                if not 0 <= x + column < self.width:
+                    continue
+                colour = source._get(column, row)
+                if palette is not None:
+                    colour = palette._get(colour, 0)
+                if colour != key:
+                    self._set(x + column, y + row, colour)
+
+    def scroll(self, xstep: int, ystep: int) -> None:
+        copy = FrameBuffer(
+            bytearray(self.buffer), self.width, self.height, self.format, self.stride
+        )
+        self.blit(copy, xstep, ystep)
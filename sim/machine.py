@@ -0,0 +1,328 @@
+"""Host implementation of the parts of MicroPython's machine module used by PicoGo."""
+
+from utime import clock
+
+
+class Pin:
+    """
+    Simulated GPIO pin.
+
+    State is shared between all instances with the same ID. Inputs may be
+    driven by a callable returning the pin level, e.g. from a world model.
+    """
+
+    IN = 0
+    OUT = 1
+    OPEN_DRAIN = 2
+    ALT = 3
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_RISING = 4
+    IRQ_FALLING = 8
+
+    levels = {}
+    modes = {}
+    drivers = {}
+    changed = {}
+    listeners = []
+
+    def __init__(self, id: int, mode: int = -1, pull: int = -1, value=None) -> None:
+        self._id = id
+        self.init(mode, pull, value)
+
+    def init(self, mode: int = -1, pull: int = -1, value=None) -> None:
+        if mode != -1:
+            Pin.modes[self._id] = mode
+        Pin.levels.setdefault(self._id, 1 if Pin.modes.get(self._id) == Pin.IN else 0)
+        if value is not None:
+            self.value(value)
+
+    @property
+    def id(self) -> int:
+        return self._id
+
+    @classmethod
+    def drive(cls, id: int, driver) -> None:
+        """Drive input pin with a callable returning its level, or None to release."""
+        if driver is None:
+            cls.drivers.pop(id, None)
+        else:
+            cls.drivers[id] = driver
+
+    @classmethod
+    def reset(cls) -> None:
+        """Reset state of all pins, with inputs pulled high."""
+        cls.levels = {id: 1 if mode == Pin.IN else 0 for id, mode in cls.modes.items()}
+        cls.drivers.clear()
+        cls.changed.clear()
+        cls.listeners.clear()
+
+    def value(self, value=None):
+        if value is None:
+            driver = Pin.drivers.get(self._id)
+            if driver is not None:
+                clock.poll()
+                return int(driver())
+            return Pin.levels.get(self._id, 0)
+        value = 1 if value else 0
+        if Pin.levels.get(self._id) != value:
+            Pin.levels[self._id] = value
+            Pin.changed[self._id] = clock.now()
+            for listener in Pin.listeners:
+                listener(self._id, value)
+        return None
+
+    def __call__(self, value=None):
+        return self.value(value)
+
+    def on(self) -> None:
+        self.value(1)
+
+    def off(self) -> None:
+        self.value(0)
+
+    def high(self) -> None:
+        self.value(1)
+
+    def low(self) -> None:
+        self.value(0)
+
+    def toggle(self) -> None:
+        self.value(not self.value())
+
+    def irq(self, handler=None, trigger=IRQ_RISING | IRQ_FALLING, hard=False):
+        return None
+
+    def __repr__(self) -> str:
+        return f"Pin({self._id})"
+
+
+class PWM:
+    """Simulated PWM output, with duty shared by pin ID."""
+
+    duties = {}
+    frequencies = {}
+    listeners = []
+
+    def __init__(self, pin: Pin, freq: int = 0, duty_u16: int = 0) -> None:
+        self._id = pin.id
+        PWM.duties.setdefault(self._id, duty_u16)
+        if freq:
+            self.freq(freq)
+
+    def freq(self, value: int | None = None):
+        if value is None:
+            return PWM.frequencies.get(self._id, 0)
+        PWM.frequencies[self._id] = value
+        return None
+
+    def duty_u16(self, value: int | None = None):
+        if value is None:
+            return PWM.duties.get(self._id, 0)
+        value = int(value) & 0xFFFF
+        if PWM.duties.get(self._id) != value:
+            PWM.duties[self._id] = value
+            for listener in PWM.listeners:
+                listener(self._id, value)
+        return None
+
+    def deinit(self) -> None:
+        PWM.duties[self._id] = 0
+
+    @classmethod
+    def reset(cls) -> None:
+        """Reset state of all PWM outputs."""
+        cls.duties.clear()
+        cls.frequencies.clear()
+        cls.listeners.clear()
+
+
+class ADC:
+    """Simulated ADC, reading values or drivers shared by channel."""
+
+    CORE_TEMP = 4
+
+    values = {
+        0: 38725,  # ~3.9V battery through divider
+        4: 14020,  # ~27C core temperature
+    }
+    drivers = {}
+
+    def __init__(self, pin) -> None:
+        self._channel = pin.id - 26 if isinstance(pin, Pin) else pin
+
+    @classmethod
+    def drive(cls, channel: int, driver) -> None:
+        """Drive channel with a callable returning a 16-bit reading, or None to release."""
+        if driver is None:
+            cls.drivers.pop(channel, None)
+        else:
+            cls.drivers[channel] = driver
+
+    def read_u16(self) -> int:
+        driver = ADC.drivers.get(self._channel)
+        if driver is not None:
+            return int(driver()) & 0xFFFF
+        return ADC.values.get(self._channel, 0)
+
+
+class UART:
+    """
+    Simulated UART.
+
+    Bytes fed by the host are read by the device, and bytes written by the
+    device are collected in output, transmitting at 10 bits per byte.
+    """
+
+    ports = {}
+
+    def __init__(self, id: int, baudrate: int = 115200, **kwargs) -> None:
+        self._id = id
+        self.baudrate = baudrate
+        self._input = bytearray()
+        self.output = bytearray()
+        self._transmitted = 0
+        UART.ports[id] = self
+
+    def feed(self, data: bytes) -> None:
+        """Make data available to read."""
+        self._input.extend(data)
+
+    def any(self) -> int:
+        clock.poll()
+        return len(self._input)
+
+    def read(self, nbytes: int | None = None) -> bytes | None:
+        if not self._input:
+            return None
+        if nbytes is None:
+            nbytes = len(self._input)
+        data = bytes(self._input[:nbytes])
+        del self._input[:nbytes]
+        return data
+
+    def readinto(self, buf, nbytes: int | None = None) -> int | None:
+        data = self.read(len(buf) if nbytes is None else min(nbytes, len(buf)))
+        if data is None:
+            return None
+        buf[: len(data)] = data
+        return len(data)
+
+    def readline(self) -> bytes | None:
+        index = self._input.find(b"\n")
+        return self.read(None if index < 0 else index + 1)
+
+    def write(self, data) -> int:
+        if isinstance(data, str):
+            data = data.encode()
+        self.output.extend(data)
+        self._transmitted = max(self._transmitted, clock.now()) + (
+            len(data) * 10 * 1_000_000 // self.baudrate
+        )
+        return len(data)
+
+    def txdone(self) -> bool:
+        return clock.now() >= self._transmitted
+
+
+class SPI:
+    """Simulated SPI bus, counting bytes written."""
+
+    def __init__(self, id: int, baudrate: int = 1_000_000, **kwargs) -> None:
+        self._id = id
+        self.baudrate = baudrate
+        self.written = 0
+
+    def write(self, data) -> None:
+        self.written += len(data)
+        # Account for transfer time in virtual time
+        if clock.virtual:
+            clock.advance(len(data) * 8 * 1_000_000 // self.baudrate)
+
+
+class Timer:
+    """Simulated hardware timer, fired by the utime clock."""
+
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, id: int = -1, **kwargs) -> None:
+        self.deadline = 0
+        self.interval = 0
+        self.mode = Timer.PERIODIC
+        self.callback = None
+        if kwargs.get("callback") is not None:
+            self.init(**kwargs)
+
+    def init(
+        self,
+        *,
+        mode: int = PERIODIC,
+        freq: float = -1,
+        period: int = -1,
+        tick_hz: int = 1000,
+        callback=None,
+    ) -> None:
+        self.deinit()
+        if freq > 0:
+            self.interval = max(1, int(1_000_000 / freq))
+        else:
+            self.interval = max(1, int(period * 1_000_000 // tick_hz))
+        self.mode = mode
+        self.callback = callback
+        self.deadline = clock.now() + self.interval
+        clock.timers.append(self)
+
+    def deinit(self) -> None:
+        if self in clock.timers:
+            clock.timers.remove(self)
+
+    def fire(self) -> None:
+        """Call timer callback, rescheduling periodic timers."""
+        if self.mode == Timer.PERIODIC:
+            self.deadline += self.interval
+        else:
+            self.deinit()
+        if self.callback is not None:
+            self.callback(self)
+
+
+class WDT:
+    """Simulated watchdog timer, raising an error if not fed in time."""
+
+    def __init__(self, id: int = 0, timeout: int = 5000) -> None:
+        self.timeout = timeout
+        self._fed = clock.now()
+
+    def feed(self) -> None:
+        now = clock.now()
+        if now - self._fed > self.timeout * 1000:
+            raise RuntimeError("Watchdog timeout")
+        self._fed = now
+
+
+def time_pulse_us(pin: Pin, pulse_level: int, timeout_us: int = 1_000_000) -> int:
+    """Return duration of next pulse, -2 if it never starts or -1 if it never ends."""
+    start = clock.now()
+    while pin.value() != pulse_level:
+        clock.poll()
+        if clock.now() - start > timeout_us:
+            return -2
+    start = clock.now()
+    while pin.value() == pulse_level:
+        clock.poll()
+        if clock.now() - start > timeout_us:
+            return -1
+    return clock.now() - start
+
+
+def freq(value: int | None = None) -> int | None:
+    return 125_000_000 if value is None else None
+
+
+def unique_id() -> bytes:
+    return b"\x00" * 8
+
+
+def reset() -> None:
+    raise SystemExit("machine.reset()")
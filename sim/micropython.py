@@ -0,0 +1,22 @@
+"""
+Host implementation of MicroPython's micropython module.
+
+Code emitters such as viper are deliberately absent, so that modules fall
+back to their pure Python implementations.
+"""
+
+
+def const(value):
+    return value
+
+
+def schedule(function, argument) -> None:
+    function(argument)
+
+
+def alloc_emergency_exception_buf(size: int) -> None:
+    pass
+
+
+def mem_info(verbose: int = 0) -> None:
+    pass
@@ -0,0 +1,32 @@
+"""Host implementation of MicroPython's neopixel module."""
+
+
+class NeoPixel:
+    ORDER = (1, 0, 2, 3)
+
+    def __init__(self, pin, n: int, bpp: int = 3, timing: int = 1) -> None:
+        self.pin = pin
+        self.n = n
+        self.bpp = bpp
+        self.timing = timing
+        self.buf = bytearray(n * bpp)
+        self.writes = 0
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __setitem__(self, index: int, value) -> None:
+        offset = index * self.bpp
+        for i in range(self.bpp):
+            self.buf[offset + self.ORDER[i]] = value[i]
+
+    def __getitem__(self, index: int):
+        offset = index * self.bpp
+        return tuple(self.buf[offset + self.ORDER[i]] for i in range(self.bpp))
+
+    def fill(self, value) -> None:
+        for index in range(self.n):
+            self[index] = value
+
+    def write(self) -> None:
+        self.writes += 1
@@ -0,0 +1,126 @@
+"""Drive simulated inputs of the PicoGo's peripherals on the host."""
+
+from bisect import bisect_right
+
+from machine import ADC, PWM, UART, Pin
+from rp2 import StateMachine
+from utime import clock
+
+SONAR_ECHO = 15
+SONAR_TRIGGER = 14
+REMOTE = 5
+INFRARED_LEFT = 3
+INFRARED_RIGHT = 2
+SPEED_OF_SOUND = 343  # m/s
+
+
+def reset() -> None:
+    """Reset all simulated peripherals and the clock."""
+    Pin.reset()
+    PWM.reset()
+    ADC.drivers.clear()
+    UART.ports.clear()
+    StateMachine.source = None
+    StateMachine.channels = [512] * 11
+    clock.timers.clear()
+    sonar(2000)
+
+
+def sonar(distance_mm, delay_us: int = 450) -> None:
+    """
+    Echo sonar pings from an object at the given distance.
+
+    Distance may be a number, or a callable evaluated for each ping. A
+    distance of None produces no echo, as when out of range.
+    """
+    ping = {"trigger": None, "duration": None}
+
+    def echo() -> int:
+        if Pin.levels.get(SONAR_TRIGGER):
+            return 0
+        triggered = Pin.changed.get(SONAR_TRIGGER)
+        if triggered is None:
+            return 0
+        if ping["trigger"] != triggered:
+            distance = distance_mm() if callable(distance_mm) else distance_mm
+            ping["trigger"] = triggered
+            ping["duration"] = (
+                None if distance is None else distance * 2000 / SPEED_OF_SOUND
+            )
+        if ping["duration"] is None:
+            return 0
+        elapsed = clock.now() - triggered - delay_us
+        return 1 if 0 <= elapsed < ping["duration"] else 0
+
+    Pin.drive(SONAR_ECHO, echo)
+
+
+NEC_REPEAT = [(9000, 0), (2250, 1), (562, 0)]
+
+
+def nec_segments(command: int, address: int = 0x00) -> list[tuple[int, int]]:
+    """Return NEC frame as segments of duration in microseconds and pin level."""
+    segments = [(9000, 0), (4500, 1)]
+    for byte in (address, ~address & 0xFF, command, ~command & 0xFF):
+        for bit in range(8):
+            segments.append((562, 0))
+            segments.append((1687 if byte >> bit & 1 else 562, 1))
+    segments.append((562, 0))
+    return segments
+
+
+def remote(command: int | str | None, address: int = 0x00) -> None:
+    """
+    Transmit NEC frame for command to remote pin now, or release it with None.
+
+    A command of "repeat" transmits the repeat code sent whilst a key is held.
+    """
+    if command is None:
+        Pin.drive(REMOTE, None)
+        return
+    if command == "repeat":
+        segments = NEC_REPEAT
+    else:
+        segments = nec_segments(command, address)
+    times = []
+    levels = []
+    elapsed = 0
+    for duration, level in segments:
+        times.append(elapsed)
+        levels.append(level)
+        elapsed += duration
+    start = clock.now()
+
+    def level() -> int:
+        index = bisect_right(times, clock.now() - start) - 1
+        if index < 0 or index >= len(levels) or clock.now() - start >= elapsed:
+            return 1
+        return levels[index]
+
+    Pin.drive(REMOTE, level)
+
+
+def infrared(left: bool = False, right: bool = False) -> None:
+    """Set whether each infrared obstacle sensor is triggered."""
+    Pin.levels[INFRARED_LEFT] = 0 if left else 1
+    Pin.levels[INFRARED_RIGHT] = 0 if right else 1
+
+
+def tracking(values) -> None:
+    """
+    Set 10-bit readings of the tracking sensors.
+
+    Values may be a list of readings, or a callable taking the channel.
+    """
+    if callable(values):
+        StateMachine.source = values
+        return
+    StateMachine.source = None
+    StateMachine.channels[: len(values)] = list(values)
+
+
+def bluetooth(data: bytes | str) -> None:
+    """Send data to the Bluetooth UART."""
+    if isinstance(data, str):
+        data = data.encode()
+    UART.ports[0].feed(data)
@@ -0,0 +1,62 @@
+"""Host implementation of the parts of MicroPython's rp2 module used by PicoGo."""
+
+from utime import clock
+
+
+class PIO:
+    OUT_LOW = 0
+    OUT_HIGH = 1
+    IN_LOW = 0
+    IN_HIGH = 1
+    SHIFT_LEFT = 0
+    SHIFT_RIGHT = 1
+
+
+def asm_pio(**kwargs):
+    """Return PIO program unchanged, as it is never assembled on the host."""
+    return lambda program: program
+
+
+class StateMachine:
+    """
+    Simulated state machine running the TLC1543 tracking ADC program.
+
+    Each word put selects a channel in its top 4 bits, and the following get
+    returns the 10-bit conversion of the previously selected channel.
+    """
+
+    channels = [512] * 11
+    source = None
+
+    def __init__(self, id: int, program=None, freq: int = 125_000_000, **kwargs):
+        self._id = id
+        self.freq = freq
+        self._previous = 0
+        self._selected = 0
+        self._active = 0
+
+    def init(self, program=None, freq: int = 125_000_000, **kwargs) -> None:
+        self.freq = freq
+
+    @classmethod
+    def read(cls, channel: int) -> int:
+        """Return simulated 10-bit reading of channel."""
+        if cls.source is not None:
+            return int(cls.source(channel)) & 0x3FF
+        return cls.channels[channel]
+
+    def active(self, value: int | None = None):
+        if value is None:
+            return self._active
+        self._active = value
+        return None
+
+    def put(self, value: int, shift: int = 0) -> None:
+        self._previous = self._selected
+        self._selected = (value >> 28) & 0xF
+        # 12 bits clocked at 4 cycles per bit
+        if clock.virtual:
+            clock.advance(max(1, 12 * 4 * 1_000_000 // self.freq))
+
+    def get(self, buf=None, shift: int = 0) -> int:
+        return self.read(self._previous) << 2
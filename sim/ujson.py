@@ -0,0 +1,21 @@
+"""Host implementation of MicroPython's ujson module."""
+
+import json
+
+
+def loads(data):
+    if not isinstance(data, str):
+        data = bytes(data)
+    return json.loads(data)
+
+
+def dumps(obj, separators=None) -> str:
+    return json.dumps(obj, separators=separators)
+
+
+def load(stream):
+    return json.load(stream)
+
+
+def dump(obj, stream, separators=None) -> None:
+    json.dump(obj, stream, separators=separators)
@@ -0,0 +1,126 @@
+"""Host implementation of MicroPython's utime module, with an optional virtual clock."""
+
+import time as _time
+
+TICKS_PERIOD = 1 << 30
+TICKS_HALF_PERIOD = TICKS_PERIOD >> 1
+
+
+class Clock:
+    """
+    Monotonic clock in microseconds, which also services machine.Timer instances.
+
+    In real mode, time follows the host clock and sleeps block. In virtual
+    mode, time only advances when sleeping, reading the time or polling
+    inputs, so code runs as fast as the host allows whilst seeing
+    consistent timings.
+    """
+
+    def __init__(self) -> None:
+        """Initialise clock instance."""
+        self.virtual = False
+        self.poll_cost_us = 5
+        self.timers = []
+        self._origin = _time.perf_counter_ns()
+        self._now = 0
+        self._servicing = False
+
+    def now(self) -> int:
+        """Return current time in microseconds."""
+        if self.virtual:
+            return self._now
+        return (_time.perf_counter_ns() - self._origin) // 1000
+
+    def set_virtual(self, virtual: bool = True) -> None:
+        """Switch between virtual and real time, continuing from the current time."""
+        now = self.now()
+        self.virtual = virtual
+        self._now = now
+        self._origin = _time.perf_counter_ns() - now * 1000
+
+    def advance(self, us: int) -> None:
+        """Advance time by the given microseconds, firing any timers due."""
+        if not self.virtual:
+            if us > 0:
+                _time.sleep(us / 1_000_000)
+            self.service()
+            return
+        target = self._now + max(0, int(us))
+        while not self._servicing:
+            timer = self._next_timer()
+            if timer is None or timer.deadline > target:
+                break
+            self._now = max(self._now, timer.deadline)
+            self._fire(timer)
+        self._now = max(self._now, target)
+
+    def poll(self) -> None:
+        """Account for the cost of polling an input in virtual time."""
+        if self.virtual:
+            self.advance(self.poll_cost_us)
+
+    def service(self) -> None:
+        """Fire timers which are due at the current time."""
+        now = self.now()
+        while not self._servicing:
+            timer = self._next_timer()
+            if timer is None or timer.deadline > now:
+                break
+            self._fire(timer)
+
+    def _next_timer(self):
+        """Return timer with the earliest deadline, if any."""
+        return min(self.timers, key=lambda timer: timer.deadline, default=None)
+
+    def _fire(self, timer) -> None:
+        """Fire timer, preventing timers firing within its callback."""
+        self._servicing = True
+        try:
+            timer.fire()
+        finally:
+            self._servicing = False
+
+
+clock = Clock()
+
+
+def ticks_us() -> int:
+    clock.poll()
+    return clock.now() % TICKS_PERIOD
+
+
+def ticks_ms() -> int:
+    clock.poll()
+    return (clock.now() // 1000) % TICKS_PERIOD
+
+
+def ticks_cpu() -> int:
+    return ticks_us()
+
+
+def ticks_add(ticks: int, delta: int) -> int:
+    return (ticks + delta) % TICKS_PERIOD
+
+
+def ticks_diff(end: int, start: int) -> int:
+    return ((end - start + TICKS_HALF_PERIOD) % TICKS_PERIOD) - TICKS_HALF_PERIOD
+
+
+def sleep_us(us: int) -> None:
+    clock.advance(us)
+
+
+def sleep_ms(ms: int) -> None:
+    clock.advance(ms * 1000)
+
+
+def sleep(seconds: float) -> None:
+    clock.advance(int(seconds * 1_000_000))
+
+
+def time() -> int:
+    return clock.now() // 1_000_000
+
+
+def time_ns() -> int:
+    return clock.now() * 1000
@@ -0,0 +1,475 @@
+"""
+Two-dimensional world model of the PicoGo for software-in-the-loop simulation.
+
+A differential-drive robot is moved by the simulated motor outputs, over a
+rasterised track which produces tracking ADC readings, amongst obstacles
+which produce sonar echoes and infrared hits. The world is integrated
+lazily up to the virtual clock whenever a motor output changes, and at
+most a step behind when an input is read.
+"""
+
+import math
+import random
+
+import peripherals
+from machine import PWM, Pin
+from utime import clock
+
+# Speed PWM, forward and backward pins of each motor
+LEFT_MOTOR = (16, 17, 18)
+RIGHT_MOTOR = (21, 20, 19)
+
+
+class Track:
+    """
+    Rasterised track of dark lines on a light floor.
+
+    Each cell holds the darkness of the floor from 0 to 255. Lines drawn as
+    polylines are kept, so positions can be measured against them.
+    """
+
+    def __init__(
+        self, width_mm: float, height_mm: float, resolution_mm: float = 2.0
+    ) -> None:
+        """Initialise blank track."""
+        self.resolution_mm = resolution_mm
+        self.columns = int(math.ceil(width_mm / resolution_mm))
+        self.rows = int(math.ceil(height_mm / resolution_mm))
+        self.cells = bytearray(self.columns * self.rows)
+        self.paths = []
+
+    @property
+    def width_mm(self) -> float:
+        """Return width of track."""
+        return self.columns * self.resolution_mm
+
+    @property
+    def height_mm(self) -> float:
+        """Return height of track."""
+        return self.rows * self.resolution_mm
+
+    def darkness(self, x: float, y: float) -> float:
+        """Return darkness of floor at position from 0 to 1, light outside track."""
+        column = int(x / self.resolution_mm)
+        row = int(y / self.resolution_mm)
+        if 0 <= column < self.columns and 0 <= row < self.rows:
+            return self.cells[row * self.columns + column] / 255
+        return 0.0
+
+    def line(
+        self,
+        points: list[tuple[float, float]],
+        width_mm: float = 18.0,
+        closed: bool = False,
+        edge_mm: float = 2.0,
+    ) -> None:
+        """Draw line through points, with edges blurred as seen by a sensor."""
+        if closed:
+            points = list(points) + [points[0]]
+        self.paths.append(Path(points))
+        half = width_mm / 2
+        reach = half + edge_mm
+        resolution = self.resolution_mm
+        for (x1, y1), (x2, y2) in zip(points, points[1:]):
+            left = max(int((min(x1, x2) - reach) / resolution), 0)
+            right = min(int((max(x1, x2) + reach) / resolution) + 1, self.columns)
+            top = max(int((min(y1, y2) - reach) / resolution), 0)
+            bottom = min(int((max(y1, y2) + reach) / resolution) + 1, self.rows)
+            for row in range(top, bottom):
+                y = (row + 0.5) * resolution
+                offset = row * self.columns
+                for column in range(left, right):
+                    x = (column + 0.5) * resolution
+                    distance = _segment_distance(x, y, x1, y1, x2, y2)
+                    if distance >= reach:
+                        continue
+                    value = int(255 * min(1.0, (reach - distance) / (2 * edge_mm)))
+                    if value > self.cells[offset + column]:
+                        self.cells[offset + column] = value
+
+    @classmethod
+    def oval(
+        cls,
+        straight_mm: float = 800.0,
+        radius_mm: float = 300.0,
+        margin_mm: float = 200.0,
+        width_mm: float = 18.0,
+        resolution_mm: float = 2.0,
+    ) -> "Track":
+        """Return track of a closed oval line, running anticlockwise from the bottom."""
+        track = cls(
+            straight_mm + 2 * (radius_mm + margin_mm),
+            2 * (radius_mm + margin_mm),
+            resolution_mm,
+        )
+        left = margin_mm + radius_mm
+        right = left + straight_mm
+        centre = margin_mm + radius_mm
+        steps = max(8, int(math.pi * radius_mm / 20))
+        points = []
+        for index in range(steps + 1):
+            angle = -math.pi / 2 + math.pi * index / steps
+            points.append(
+                (
+                    right + radius_mm * math.cos(angle),
+                    centre + radius_mm * math.sin(angle),
+                )
+            )
+        for index in range(steps + 1):
+            angle = math.pi / 2 + math.pi * index / steps
+            points.append(
+                (
+                    left + radius_mm * math.cos(angle),
+                    centre + radius_mm * math.sin(angle),
+                )
+            )
+        track.line(points, width_mm, closed=True)
+        return track
+
+    @classmethod
+    def from_pgm(cls, path: str, resolution_mm: float = 2.0) -> "Track":
+        """Return track from a binary PGM image, with dark pixels as lines."""
+        with open(path, "rb") as file:
+            data = file.read()
+        tokens = []
+        position = 0
+        while len(tokens) < 4:
+            while data[position : position + 1].isspace():
+                position += 1
+            if data[position : position + 1] == b"#":
+                position = data.index(b"\n", position)
+                continue
+            start = position
+            while not data[position : position + 1].isspace():
+                position += 1
+            tokens.append(data[start:position])
+        if tokens[0] != b"P5" or int(tokens[3]) > 255:
+            raise ValueError("Only 8-bit binary PGM images are supported")
+        columns, rows = int(tokens[1]), int(tokens[2])
+        maximum = int(tokens[3])
+        pixels = data[position + 1 : position + 1 + columns * rows]
+        track = cls(columns * resolution_mm, rows * resolution_mm, resolution_mm)
+        track.cells[:] = bytes(255 - value * 255 // maximum for value in pixels)
+        return track
+
+    def save_pgm(self, path: str) -> None:
+        """Save track as a binary PGM image, with dark pixels as lines."""
+        with open(path, "wb") as file:
+            file.write(f"P5\n{self.columns} {self.rows}\n255\n".encode())
+            file.write(bytes(255 - value for value in self.cells))
+
+
+class Path:
+    """Polyline, measuring distance along and across it."""
+
+    def __init__(self, points: list[tuple[float, float]]) -> None:
+        """Initialise path through points."""
+        self.points = list(points)
+        self.starts = [0.0]
+        for (x1, y1), (x2, y2) in zip(self.points, self.points[1:]):
+            self.starts.append(self.starts[-1] + math.hypot(x2 - x1, y2 - y1))
+        self.length = self.starts[-1]
+
+    def project(self, x: float, y: float) -> tuple[float, float]:
+        """Return distance along path of nearest point, and distance to it."""
+        nearest = (0.0, math.inf)
+        for index, ((x1, y1), (x2, y2)) in enumerate(zip(self.points, self.points[1:])):
+            dx, dy = x2 - x1, y2 - y1
+            length = dx * dx + dy * dy
+            fraction = 0.0
+            if length:
+                fraction = min(max(((x - x1) * dx + (y - y1) * dy) / length, 0.0), 1.0)
+            px, py = x1 + fraction * dx, y1 + fraction * dy
+            distance = math.hypot(x - px, y - py)
+            if distance < nearest[1]:
+                along = self.starts[index] + fraction * math.sqrt(length)
+                nearest = (along, distance)
+        return nearest
+
+
+def _segment_distance(
+    x: float, y: float, x1: float, y1: float, x2: float, y2: float
+) -> float:
+    """Return distance from point to line segment."""
+    dx, dy = x2 - x1, y2 - y1
+    length = dx * dx + dy * dy
+    if not length:
+        return math.hypot(x - x1, y - y1)
+    fraction = min(max(((x - x1) * dx + (y - y1) * dy) / length, 0.0), 1.0)
+    return math.hypot(x - x1 - fraction * dx, y - y1 - fraction * dy)
+
+
+class Circle:
+    """Circular obstacle, e.g. a post."""
+
+    def __init__(self, x: float, y: float, radius_mm: float) -> None:
+        """Initialise obstacle."""
+        self.x = x
+        self.y = y
+        self.radius_mm = radius_mm
+
+    def distance(self, x: float, y: float) -> float:
+        """Return distance from point to surface."""
+        return math.hypot(x - self.x, y - self.y) - self.radius_mm
+
+    def ray(self, x: float, y: float, dx: float, dy: float) -> float | None:
+        """Return distance along unit ray to surface, if hit."""
+        ox, oy = x - self.x, y - self.y
+        along = -(ox * dx + oy * dy)
+        squared = along * along - (ox * ox + oy * oy - self.radius_mm**2)
+        if squared < 0:
+            return None
+        distance = along - math.sqrt(squared)
+        return distance if distance >= 0 else None
+
+
+class Wall:
+    """Straight wall obstacle between two points."""
+
+    def __init__(self, x1: float, y1: float, x2: float, y2: float) -> None:
+        """Initialise obstacle."""
+        self.x1, self.y1, self.x2, self.y2 = x1, y1, x2, y2
+
+    def distance(self, x: float, y: float) -> float:
+        """Return distance from point to wall."""
+        return _segment_distance(x, y, self.x1, self.y1, self.x2, self.y2)
+
+    def ray(self, x: float, y: float, dx: float, dy: float) -> float | None:
+        """Return distance along unit ray to wall, if hit."""
+        ex, ey = self.x2 - self.x1, self.y2 - self.y1
+        denominator = dx * ey - dy * ex
+        if not denominator:
+            return None
+        wx, wy = self.x1 - x, self.y1 - y
+        distance = (wx * ey - wy * ex) / denominator
+        fraction = (wx * dy - wy * dx) / denominator
+        if distance < 0 or not 0 <= fraction <= 1:
+            return None
+        return distance
+
+
+class Robot:
+    """
+    Kinematic model of a differential-drive robot.
+
+    Each wheel's speed follows its commanded speed with a first-order lag,
+    which is shorter when braking and longer when coasting.
+    """
+
+    MAX_SPEED_MM_S = 500.0
+    WHEEL_BASE_MM = 90.0
+    RADIUS_MM = 55.0
+    DEADBAND = 0.08
+    DRIVE_TAU_S = 0.08
+    COAST_TAU_S = 0.25
+    BRAKE_TAU_S = 0.03
+    # Sensor positions, forward of the centre of the wheels
+    TRACKING_OFFSET_MM = 45.0
+    TRACKING_SPACING_MM = 14.0
+    SONAR_OFFSET_MM = 50.0
+    INFRARED_OFFSET_MM = (50.0, 30.0)  # forward, lateral
+    INFRARED_ANGLE = math.radians(20)
+
+    def __init__(self, x: float = 0.0, y: float = 0.0, heading: float = 0.0) -> None:
+        """Initialise robot at pose, heading anticlockwise from the x axis."""
+        self.x = x
+        self.y = y
+        self.heading = heading
+        self.left = 0.0
+        self.right = 0.0
+        self.odometer_mm = 0.0
+
+    @property
+    def speed_mm_s(self) -> float:
+        """Return forward speed."""
+        return (self.left + self.right) / 2
+
+    def point(self, forward: float, lateral: float = 0.0) -> tuple[float, float]:
+        """Return world position of point on robot, with lateral to the left."""
+        cos, sin = math.cos(self.heading), math.sin(self.heading)
+        return (
+            self.x + forward * cos - lateral * sin,
+            self.y + forward * sin + lateral * cos,
+        )
+
+    @classmethod
+    def wheel(cls, speed: int, forward: int, backward: int) -> tuple[float, float]:
+        """Return commanded wheel speed and time constant from motor outputs."""
+        if forward and backward:
+            return 0.0, cls.BRAKE_TAU_S
+        if not (forward or backward):
+            return 0.0, cls.COAST_TAU_S
+        duty = speed / 0xFFFF
+        if duty < cls.DEADBAND:
+            return 0.0, cls.COAST_TAU_S
+        target = duty * cls.MAX_SPEED_MM_S
+        return (target if forward else -target), cls.DRIVE_TAU_S
+
+    def step(self, commands: tuple, dt: float) -> None:
+        """Advance robot by dt seconds under wheel commands."""
+        (left, left_tau), (right, right_tau) = commands
+        self.left += (left - self.left) * (1 - math.exp(-dt / left_tau))
+        self.right += (right - self.right) * (1 - math.exp(-dt / right_tau))
+        speed = self.speed_mm_s
+        turn = (self.right - self.left) / self.WHEEL_BASE_MM
+        heading = self.heading + turn * dt / 2
+        self.x += speed * math.cos(heading) * dt
+        self.y += speed * math.sin(heading) * dt
+        self.heading += turn * dt
+        self.odometer_mm += abs(speed) * dt
+
+
+class World:
+    """
+    World of a robot on a track amongst obstacles, attached to simulated peripherals.
+
+    Tracking readings range from the light to the dark level, with Gaussian
+    noise. Sonar casts rays across its beam, and infrared sensors detect
+    obstacles within their range. The robot stops on collision.
+    """
+
+    STEP_US = 250
+    LIGHT = 80
+    DARK = 900
+    SONAR_RANGE_MM = 4000.0
+    SONAR_BEAM = math.radians(15)
+    SONAR_RAYS = 5
+    INFRARED_RANGE_MM = 60.0
+
+    def __init__(
+        self,
+        robot: Robot,
+        track: Track | None = None,
+        obstacles: tuple = (),
+        noise: float = 0.0,
+        seed: int | None = None,
+    ) -> None:
+        """Initialise world."""
+        self.robot = robot
+        self.track = track
+        self.obstacles = list(obstacles)
+        self.noise = noise
+        self.random = random.Random(seed)
+        self.collided = False
+        self.time_us = clock.now()
+        self._commands = ((0.0, Robot.COAST_TAU_S), (0.0, Robot.COAST_TAU_S))
+
+    def attach(self) -> None:
+        """Drive simulated inputs from the world, and follow motor outputs."""
+        self.time_us = clock.now()
+        self._commands = self._read_commands()
+        PWM.listeners.append(self._actuated)
+        Pin.listeners.append(self._actuated)
+        peripherals.tracking(self._tracking)
+        peripherals.sonar(self._sonar)
+        Pin.drive(peripherals.INFRARED_LEFT, lambda: self._infrared(1))
+        Pin.drive(peripherals.INFRARED_RIGHT, lambda: self._infrared(-1))
+
+    def update(self, exact: bool = False) -> None:
+        """
+        Integrate world up to the current time.
+
+        Unless exact, integration is deferred until a whole step has elapsed,
+        so inputs read in quick succession see the same pose.
+        """
+        now = clock.now()
+        if not exact and now - self.time_us < self.STEP_US:
+            return
+        while self.time_us < now:
+            step = min(self.STEP_US, now - self.time_us)
+            if not self.collided:
+                self.robot.step(self._commands, step / 1_000_000)
+                self._collide()
+            self.time_us += step
+
+    def _read_commands(self) -> tuple:
+        """Return wheel commands from motor outputs."""
+        return tuple(
+            Robot.wheel(
+                PWM.duties.get(speed, 0),
+                Pin.levels.get(forward, 0),
+                Pin.levels.get(backward, 0),
+            )
+            for speed, forward, backward in (LEFT_MOTOR, RIGHT_MOTOR)
+        )
+
+    def _actuated(self, id: int, value: int) -> None:
+        """Integrate under previous commands before applying changed outputs."""
+        if id in LEFT_MOTOR or id in RIGHT_MOTOR:
+            self.update(exact=True)
+            self._commands = self._read_commands()
+
+    def _collide(self) -> None:
+        """Stop robot if it touches an obstacle."""
+        robot = self.robot
+        for obstacle in self.obstacles:
+            if obstacle.distance(robot.x, robot.y) < robot.RADIUS_MM:
+                robot.left = robot.right = 0.0
+                self.collided = True
+                return
+
+    def _tracking(self, channel: int) -> int:
+        """Return tracking ADC reading of channel."""
+        if channel > 4:
+            return 0
+        self.update()
+        darkness = 0.0
+        if self.track is not None:
+            robot = self.robot
+            darkness = self.track.darkness(
+                *robot.point(
+                    robot.TRACKING_OFFSET_MM, (2 - channel) * robot.TRACKING_SPACING_MM
+                )
+            )
+        value = self.LIGHT + (self.DARK - self.LIGHT) * darkness
+        if self.noise:
+            value += self.random.gauss(0, self.noise)
+        return int(min(max(value, 0), 1023))
+
+    def ray(self, x: float, y: float, angle: float, limit: float) -> float | None:
+        """Return distance to the nearest obstacle along ray within limit, if any."""
+        dx, dy = math.cos(angle), math.sin(angle)
+        nearest = None
+        for obstacle in self.obstacles:
+            distance = obstacle.ray(x, y, dx, dy)
+            if distance is not None and distance <= limit:
+                if nearest is None or distance < nearest:
+                    nearest = distance
+        return nearest
+
+    def _sonar(self) -> float | None:
+        """Return distance to nearest obstacle across sonar beam, if in range."""
+        self.update()
+        robot = self.robot
+        x, y = robot.point(robot.SONAR_OFFSET_MM)
+        nearest = None
+        for index in range(self.SONAR_RAYS):
+            angle = robot.heading + self.SONAR_BEAM * (
+                2 * index / (self.SONAR_RAYS - 1) - 1
+            )
+            distance = self.ray(x, y, angle, self.SONAR_RANGE_MM)
+            if distance is not None and (nearest is None or distance < nearest):
+                nearest = distance
+        if nearest is not None and self.noise:
+            nearest += self.random.gauss(0, self.noise / 10)
+        return nearest
+
+    def _infrared(self, side: int) -> int:
+        """Return level of infrared sensor on side, left 1 or right -1, low if hit."""
+        self.update()
+        robot = self.robot
+        forward, lateral = robot.INFRARED_OFFSET_MM
+        x, y = robot.point(forward, side * lateral)
+        angle = robot.heading + side * robot.INFRARED_ANGLE
+        return 0 if self.ray(x, y, angle, self.INFRARED_RANGE_MM) is not None else 1
+
+    def clearance_mm(self) -> float:
+        """Return distance from robot's edge to the nearest obstacle."""
+        robot = self.robot
+        return min(
+            (
+                obstacle.distance(robot.x, robot.y) - robot.RADIUS_MM
+                for obstacle in self.obstacles
+            ),
+            default=math.inf,
+        )
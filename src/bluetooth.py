@@ -1,17 +1,106 @@
+from __future__ import annotations
+
 import ujson
 from machine import UART
 
 import board
+from motion import MotionQueue, parse
+
+OPEN = ord("{")
+CLOSE = ord("}")
+QUOTE = ord('"')
+BACKSLASH = ord("\\")
 
 
 class Bluetooth(UART):
     """Handle Bluetooth connectivity."""
 
     BAUDRATE = 115200
+    # Fits a motion script filling the queue, of up to 48 bytes per primitive
+    BUFFER_SIZE = 64 + 48 * MotionQueue.CAPACITY
 
     def __init__(self) -> None:
         """Initialise UART instance."""
-        super().__init__(0, self.BAUDRATE)
+        super().__init__(0, self.BAUDRATE, rxbuf=self.BUFFER_SIZE)
+        self._buffer = bytearray(self.BUFFER_SIZE)
+        self._view = memoryview(self._buffer)
+        self._length = 0
+        self._scanned = 0
+        self._start = 0
+        self._depth = 0
+        self._string = False
+        self._escape = False
+
+    def _receive(self) -> None:
+        """Read available bytes after those buffered, until it is full."""
+        length = self._length
+        count = self.any()
+        while count and length < self.BUFFER_SIZE:
+            count = min(count, self.BUFFER_SIZE - length)
+            length += self.readinto(self._view[length:], count) or 0
+            count = self.any()
+        self._length = length
+
+    def _next_message(self) -> memoryview | None:
+        """
+        Return next complete JSON object buffered, if any.
+
+        Objects are delimited by matching braces outside strings, so a burst
+        of several commands, or a command split across reads, is parsed
+        whole. Bytes between objects are skipped, and an object longer than
+        the buffer is discarded.
+        """
+        buffer = self._buffer
+        length = self._length
+        index = self._scanned
+        while index < length:
+            byte = buffer[index]
+            index += 1
+            if self._string:
+                if self._escape:
+                    self._escape = False
+                elif byte == BACKSLASH:
+                    self._escape = True
+                elif byte == QUOTE:
+                    self._string = False
+            elif byte == OPEN:
+                if not self._depth:
+                    self._start = index - 1
+                self._depth += 1
+            elif not self._depth:
+                self._start = index
+            elif byte == QUOTE:
+                self._string = True
+            elif byte == CLOSE:
+                self._depth -= 1
+                if not self._depth:
+                    start = self._start
+                    self._scanned = self._start = index
+                    return self._view[start:index]
+        self._scanned = index
+        return None
+
+    def _compact(self) -> None:
+        """Move any partly received object to the start of the buffer."""
+        start = self._start
+        if not start and self._length >= self.BUFFER_SIZE:
+            # Discard object too long to buffer
+            start = self._length
+            self._depth = 0
+            self._string = self._escape = False
+        remaining = self._length - start
+        if start and remaining:
+            self._view[:remaining] = self._view[start : self._length]
+        self._length = remaining
+        self._scanned -= start
+        self._start = 0
+
+    def reply(self, board: board.Board) -> Bluetooth:
+        """Return UART to reply to, after finishing any partly written stream packet."""
+        frames = getattr(board, "stream", None)
+        if frames is not None:
+            frames.flush()
+        return self
 
     def callback(
         self,
@@ -19,15 +108,33 @@ class Bluetooth(UART):
         speed_increment: float = 10,
         default_speed: float = 50,
     ) -> None:
-        """Control board with Bluetooth."""
-        if not self.any():
-            return
+        """Control board with each command received over Bluetooth."""
+        while self.any():
+            self._receive()
+            message = self._next_message()
+            while message is not None:
+                self._handle(board, message, speed_increment, default_speed)
+                message = self._next_message()
+            self._compact()
+
+    def _handle(
+        self,
+        board: board.Board,
+        message: memoryview,
+        speed_increment: float,
+        default_speed: float,
+    ) -> None:
+        """Control board with a JSON message."""
         try:
-            data = ujson.loads(self.read())
+            data = ujson.loads(message)
         except ValueError:
             return
 
         drive = data.get("drive")
+        queue = getattr(board, "motion", None)
+        # Manual commands take over from queued motion
+        if queue is not None and drive is not None:
+            queue.cancel(stop=False)
         if drive == "forward":
             board.drive.forward()
         elif drive == "backward":
@@ -45,12 +152,54 @@ class Bluetooth(UART):
         if speed == "default":
             board.drive.speed = default_speed
         elif speed == "increase":
-            board.drive.speed += speed_increment
+            board.drive.setpoint += speed_increment
         elif speed == "decrease":
-            board.drive.speed -= speed_increment
+            board.drive.setpoint -= speed_increment
         elif isinstance(speed, int) or isinstance(speed, float):
             board.drive.speed = float(speed)
 
+        failsafe = getattr(board, "failsafe", None)
+        if failsafe is not None and (drive is not None or "lease" in data):
+            lease = data.get("lease")
+            if not (isinstance(lease, int) or isinstance(lease, float)):
+                lease = None
+            failsafe.lease(lease)
+
+        motion = data.get("motion")
+        if queue is not None and motion is not None:
+            if motion == "cancel":
+                queue.cancel()
+            elif motion == "status":
+                reply = self.reply(board)
+                reply.write(ujson.dumps(queue.status()))
+                reply.write("\n")
+            elif isinstance(motion, list):
+                # Reject the whole script if any primitive is invalid
+                try:
+                    primitives = [parse(spec) for spec in motion]
+                except (IndexError, TypeError, ValueError):
+                    primitives = None
+                if primitives is None:
+                    error = "invalid motion"
+                elif data.get("preempt"):
+                    error = None if queue.preempt(*primitives) else "queue full"
+                else:
+                    error = None if queue.enqueue(*primitives) else "queue full"
+                if error is not None:
+                    reply = self.reply(board)
+                    reply.write(ujson.dumps({"error": error}))
+                    reply.write("\n")
+
+        stream = data.get("stream")
+        frames = getattr(board, "stream", None)
+        if frames is not None:
+            if stream == "start":
+                frames.start()
+            elif stream == "stop":
+                frames.stop()
+            elif stream == "refresh":
+                frames.refresh()
+
         buzzer = data.get("buzzer")
         if buzzer == "toggle":
             board.buzzer.toggle()
@@ -58,3 +207,28 @@ class Bluetooth(UART):
             board.buzzer.on()
         elif buzzer == "off":
             board.buzzer.off()
+        elif buzzer == "beep":
+            board.buzzer.beep()
+
+        profile = data.get("profile")
+        profiler = getattr(board, "profiler", None)
+        if profiler is not None:
+            if profile == "dump":
+                profiler.dump(self.reply(board))
+            elif profile == "show":
+                profiler.show(board.display)
+            elif profile == "reset":
+                profiler.reset()
+
+        audit = data.get("audit")
+        allocations = getattr(board, "audit", None)
+        if allocations is not None:
+            if audit == "dump":
+                allocations.dump(self.reply(board))
+            elif audit == "reset":
+                allocations.reset()
+
+        flight = data.get("flight")
+        recorder = getattr(board, "flight", None)
+        if recorder is not None and flight == "save":
+            recorder.flush()
@@ -1,14 +1,23 @@
 import os
 
+import utime
 from machine import Timer
 
 from bluetooth import Bluetooth
 from display import Display, NeoPixel
+from failsafe import Failsafe
+from flight import FlightRecorder
+from governor import SpeedGovernor
+from lighting import Animator
+from memory import AllocationAudit, GarbageCollector
+from motion import MotionQueue
 from motor import Drive, DriveState
-from ranging import Infrared, Sonar
+from profiler import Profiler
+from ranging import Infrared, RangeFinder, Sonar
 from remote import Remote
 from sensors import Battery, Temperature
 from sound import Buzzer
+from stream import FrameStream
 
 DRIVE_STATES = {
     DriveState.STOP: "Stopped",
@@ -37,33 +46,54 @@ class Board:
         # Sensors
         self.battery = Battery()
         self.temperature = Temperature()
+        self.rangefinder = RangeFinder(self.sonar, self.temperature)
         # Control
         self.bluetooth = Bluetooth()
         self.remote = Remote()
+        # Static text
+        self._board_text = f"Board: {os.uname().machine}"
 
     def display_information(self) -> None:
         """Show board information on screen."""
         self.display.fill(0x0000)
         self.display.show()
+        self.display.draw_text(
+            f"{DRIVE_STATES[self.drive.state]} {round(self.drive.speed)}%",
+            5,
+            5,
+            size=16,
+        )
         for index, text in enumerate(
             (
-                f"Board: {os.uname().machine}",
-                f"State: {DRIVE_STATES[self.drive.state]}",
-                f"Speed: {round(self.drive.speed)}%",
-                f"Distance: {self.sonar.get_distance_mm():.1f}mm",
+                self._board_text,
+                f"Distance: {self.rangefinder.get_distance_mm(max_age_ms=1000):.1f}mm",
                 f"Battery: {self.battery.percentage:.1f}% ({self.battery.voltage:.1f}V)",
                 f"Temperature: {self.temperature.celsius:.1f}C",
             )
         ):
-            self.display.text(text, 5, 5 + (index * 10), 0xFFFF)
+            self.display.draw_text(text, 5, 30 + (index * 10))
         self.display.show()
 
 
 class PicoGo(Board):
     """Class to handle the PicoGo mobile robot."""
 
+    DISPLAY_PERIOD_MS = 5000
+
     def __init__(
-        self, default_speed: float = 50, allow_collisions: bool = False
+        self,
+        default_speed: float = 50,
+        allow_collisions: bool = False,
+        profile: bool = False,
+        zero_allocation: bool = False,
+        audit: bool = False,
+        audible_feedback: bool = False,
+        lighting: bool = False,
+        adaptive_ranging: bool = False,
+        governor: bool = False,
+        command_lease_ms: int | None = None,
+        watchdog_ms: int | None = None,
+        flight_recorder: bool = False,
     ) -> None:
         """Initialise board and internal components."""
         super().__init__()
@@ -71,47 +101,142 @@ class PicoGo(Board):
         self._callbacks = []
         self.default_speed = self.drive.speed = default_speed
         self.allow_collisions = allow_collisions
+        self.audible_feedback = audible_feedback
+        self.animator = Animator(self.neopixel) if lighting else None
+        self.governor = (
+            SpeedGovernor(self.drive, self.rangefinder) if governor else None
+        )
+        self.motion = MotionQueue(self)
+        self.stream = FrameStream(self.display, self.bluetooth)
+        self.failsafe = Failsafe(
+            self.drive, default_lease_ms=command_lease_ms, watchdog_ms=watchdog_ms
+        )
+        # Governor relies on regular distance measurements
+        self.adaptive_ranging = adaptive_ranging or governor
+        self.profiler = Profiler() if profile else None
+        self.audit = AllocationAudit() if audit else None
+        self.garbage_collector = GarbageCollector() if zero_allocation else None
+        self.flight = FlightRecorder() if flight_recorder else None
+        self._instruments = [
+            instrument
+            for instrument in (self.audit, self.profiler)
+            if instrument is not None
+        ]
+        self._display_deadline = utime.ticks_ms()
+        self._running = False
+
+    def add_timer(self, name: str, period: int, callback: callable) -> None:
+        """Add periodic timer, instrumenting its callback if enabled."""
+        for instrument in self._instruments:
+            callback = instrument.wrap(name, callback)
+        self._timers.append(
+            Timer(mode=Timer.PERIODIC, period=period, callback=callback)
+        )
+
+    def add_callback(self, name: str, callback: callable) -> None:
+        """Add callback to main loop, instrumenting it if enabled."""
+        for instrument in self._instruments:
+            callback = instrument.wrap(name, callback)
+        self._callbacks.append(callback)
 
     def register(self) -> None:
         """Register callbacks and timers for handling board."""
-        self._timers.extend(
-            [
-                Timer(
-                    mode=Timer.PERIODIC,
-                    period=5000,
-                    callback=lambda _: self.display_information(),
-                ),
-            ]
-        )
-        self._callbacks.append(
+        if self.garbage_collector is None:
+            self.add_timer(
+                "display",
+                self.DISPLAY_PERIOD_MS,
+                lambda _: self.display_information(),
+            )
+        self.add_callback(
+            "bluetooth",
             lambda board: board.bluetooth.callback(
                 board, default_speed=board.default_speed
-            )
+            ),
         )
-        self._callbacks.append(
+        self.add_callback(
+            "remote",
             lambda board: board.remote.callback(
                 board, default_speed=board.default_speed
-            )
+            ),
         )
-        self._callbacks.append(
+        self.add_callback(
+            "collision",
             lambda board: not board.allow_collisions
             and board.infrared.any
             and board.drive.state == DriveState.FORWARD
-            and board.drive.brake()
+            and board.drive.brake(),
         )
+        if self.adaptive_ranging:
+            self.add_callback(
+                "ranging", lambda board: board.rangefinder.update(board.drive)
+            )
+        if self.governor is not None:
+            self.add_timer(
+                "governor",
+                SpeedGovernor.PERIOD_MS,
+                lambda _: self.governor.update(),
+            )
+        if self.audible_feedback:
+            self.add_callback(
+                "feedback", lambda board: board.buzzer.notify(board.drive.state)
+            )
+        if self.animator is not None:
+            self.add_callback(
+                "lighting",
+                lambda board: board.animator.notify(board.drive.state, board.battery),
+            )
+            self.animator.start()
+        self.add_callback("stream", lambda board: board.stream.update())
+        self.add_callback("failsafe", lambda board: board.failsafe.heartbeat())
+        self.failsafe.start()
+        if self.garbage_collector is not None:
+            self.add_callback("idle", lambda board: board.idle())
+        if self.flight is not None:
+            self.flight.start(self)
+            self.add_callback("flight", lambda board: board.flight.sample(board))
+        if self.profiler is not None:
+            self._callbacks.append(lambda board: board.profiler.tick())
+
+    def idle(self) -> None:
+        """Run deferred work which allocates memory, then collect garbage."""
+        now = utime.ticks_ms()
+        if utime.ticks_diff(now, self._display_deadline) >= 0:
+            self.display_information()
+            self._display_deadline = utime.ticks_add(now, self.DISPLAY_PERIOD_MS)
+        self.garbage_collector.idle()
 
     def unregister(self) -> None:
         """Unregister callbacks and timers."""
         for timer in self._timers:
             timer.deinit()
+        self._timers.clear()
         self._callbacks.clear()
+        self.drive.limit = 100
+        self.failsafe.stop()
+        self.motion.cancel(stop=False)
+        self.stream.stop()
+        if self.garbage_collector is not None:
+            self.garbage_collector.disable()
+        self.buzzer.stop()
+        if self.animator is not None:
+            self.animator.stop()
+        if self.flight is not None:
+            self.flight.stop()
 
     def start(self) -> None:
         """Start main loop."""
         self.register()
+        if self.garbage_collector is not None:
+            self.garbage_collector.enable()
+        self._running = True
         try:
-            while True:
+            while self._running:
                 for callback in self._callbacks:
                     callback(self)
         except KeyboardInterrupt:
-            self.unregister()
+            pass
+        self.unregister()
+
+    def stop(self) -> None:
+        """Stop main loop after the current iteration."""
+        self._running = False
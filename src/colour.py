@@ -0,0 +1,136 @@
+from collections import namedtuple
+
+import micropython
+
+BaseColour = namedtuple("BaseColour", ["red", "green", "blue"])
+
+# Native values of enumerated colours, keyed by colour
+_natives = {}
+
+
+def rgb565(red: int, green: int, blue: int) -> int:
+    """Return 16-bit RGB565 value of 24-bit RGB components."""
+    return ((red & 0xF8) << 8) | ((green & 0xFC) << 3) | (blue >> 3)
+
+
+def swap16(value: int) -> int:
+    """Return 16-bit value with its bytes swapped."""
+    return ((value & 0xFF) << 8) | (value >> 8)
+
+
+def native(red: int, green: int, blue: int) -> int:
+    """
+    Return panel-native 16-bit value of 24-bit RGB components.
+
+    framebuf.RGB565 stores pixels little-endian, whereas the ST7789 reads
+    them big-endian, so the native value is RGB565 with its bytes swapped.
+    """
+    return swap16(rgb565(red, green, blue))
+
+
+class Colour(BaseColour):
+    """Implement colour helper methods."""
+
+    @property
+    def rgb565(self) -> tuple[int, int, int]:
+        """Convert 24-bit RGB to RGB565 components."""
+        return (self.red >> 3, self.green >> 2, self.blue >> 3)
+
+    @property
+    def rgb_16bit(self) -> int:
+        """Convert 24-bit RGB components to 16-bit RGB565 value."""
+        return rgb565(self.red, self.green, self.blue)
+
+    @property
+    def rgb_24bit(self) -> int:
+        """Convert 24-bit RGB components to 24-bit RGB value."""
+        return (self.red << 16) | (self.green << 8) | self.blue
+
+    @property
+    def native(self) -> int:
+        """Return panel-native 16-bit value, for drawing on the display."""
+        value = _natives.get(self)
+        if value is None:
+            value = native(self.red, self.green, self.blue)
+        return value
+
+
+class Colours:
+    """Enumeration of RGB color codes."""
+
+    BLACK = Colour(0, 0, 0)
+    WHITE = Colour(255, 255, 255)
+    RED = Colour(255, 0, 0)
+    ORANGE = Colour(255, 150, 0)
+    YELLOW = Colour(255, 255, 0)
+    GREEN = Colour(0, 255, 0)
+    BLUE = Colour(0, 0, 255)
+    CYAN = Colour(0, 255, 255)
+    PURPLE = Colour(180, 0, 255)
+    MAGENTA = Colour(255, 0, 255)
+
+
+# Precompute native values of enumerated colours
+for _colour in Colours.__dict__.values():
+    if isinstance(_colour, Colour):
+        _natives[_colour] = native(*_colour)
+
+
+try:
+
+    @micropython.viper
+    def swap_bytes(buffer, pixels: int):
+        """Swap bytes of 16-bit pixels of buffer in place, e.g. from little-endian RGB565."""
+        data = ptr8(buffer)  # noqa: F821
+        index = 0
+        end = pixels * 2
+        while index < end:
+            low = data[index]
+            data[index] = data[index + 1]
+            data[index + 1] = low
+            index += 2
+
+    @micropython.viper
+    def convert_rgb888(source, destination, pixels: int):
+        """Convert 24-bit RGB pixels of source to panel-native pixels of destination."""
+        src = ptr8(source)  # noqa: F821
+        dst = ptr8(destination)  # noqa: F821
+        index = 0
+        while index < pixels:
+            red = src[index * 3]
+            green = src[index * 3 + 1]
+            blue = src[index * 3 + 2]
+            dst[index * 2] = (red & 0xF8) | (green >> 5)
+            dst[index * 2 + 1] = ((green & 0x1C) << 3) | (blue >> 3)
+            index += 1
+
+except AttributeError:
+    # Viper code emitter is unavailable, e.g. on the host
+
+    def swap_bytes(buffer, pixels: int) -> None:
+        """Swap bytes of 16-bit pixels of buffer in place, e.g. from little-endian RGB565."""
+        end = pixels * 2
+        buffer[0:end:2], buffer[1:end:2] = buffer[1:end:2], buffer[0:end:2]
+
+    def convert_rgb888(source, destination, pixels: int) -> None:
+        """Convert 24-bit RGB pixels of source to panel-native pixels of destination."""
+        for index in range(pixels):
+            value = rgb565(
+                source[index * 3], source[index * 3 + 1], source[index * 3 + 2]
+            )
+            destination[index * 2] = value >> 8
+            destination[index * 2 + 1] = value & 0xFF
+
+
+def gradient(start: Colour, end: Colour, pixels: int) -> bytearray:
+    """Return panel-native pixels interpolated linearly from start to end colour."""
+    rgb = bytearray(pixels * 3)
+    last = max(pixels - 1, 1)
+    for index in range(pixels):
+        for channel in range(3):
+            rgb[index * 3 + channel] = (
+                start[channel] + (end[channel] - start[channel]) * index // last
+            )
+    buffer = bytearray(pixels * 2)
+    convert_rgb888(rgb, buffer, pixels)
+    return buffer
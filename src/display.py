@@ -1,45 +1,9 @@
-from collections import namedtuple
-
 import framebuf
 from machine import SPI, Pin
 from neopixel import NeoPixel as BaseNeoPixel
 
-BaseColour = namedtuple("BaseColour", ["red", "green", "blue"])
-
-
-class Colour(BaseColour):
-    """Implement colour helper methods."""
-
-    @property
-    def rgb565(self) -> tuple[int, int, int]:
-        """Convert 24-bit RGB to RGB565 components."""
-        return (self.red >> 3, self.green >> 2, self.blue >> 3)
-
-    @property
-    def rgb_24bit(self) -> int:
-        """Convert 24-bit RGB components to 24-bit RGB value."""
-        return (self.red << 16) | (self.green << 8) | self.blue
-
-    @property
-    def brg_16bit(self) -> int:
-        """Convert 24-bit RGB components to 16-bit BRG value."""
-        red, green, blue = self.rgb565
-        return (blue << 11) | (red << 5) | green
-
-
-class Colours:
-    """Enumeration of RGB color codes."""
-
-    BLACK = Colour(0, 0, 0)
-    WHITE = Colour(255, 255, 255)
-    RED = Colour(255, 0, 0)
-    ORANGE = Colour(255, 150, 0)
-    YELLOW = Colour(255, 255, 0)
-    GREEN = Colour(0, 255, 0)
-    BLUE = Colour(0, 0, 255)
-    CYAN = Colour(0, 255, 255)
-    PURPLE = Colour(180, 0, 255)
-    MAGENTA = Colour(255, 0, 255)
+from colour import Colour, Colours, gradient
+from font import Font, TextRenderer
 
 
 class Led(Pin):
@@ -126,6 +90,9 @@ class Display(framebuf.FrameBuffer):
     """Control an ST7789 display."""
 
     BAUDRATE = 10_000_000
+    FONT_PATH = "font.pgf"
+    COLUMN_ADDRESS = bytes((0x00, 0x28, 0x01, 0x17))
+    ROW_ADDRESS = bytes((0x00, 0x35, 0x00, 0xBB))
 
     def __init__(
         self,
@@ -141,6 +108,8 @@ class Display(framebuf.FrameBuffer):
         self.width = width
         self.height = height
         self.buffer = bytearray(self.height * self.width * 2)
+        self._command = bytearray(1)
+        self._renderer = None
 
         self.dc = dc
         self.dc.on()
@@ -156,7 +125,7 @@ class Display(framebuf.FrameBuffer):
         super().__init__(self.buffer, self.width, self.height, framebuf.RGB565)
         self.init_display()
 
-    def _write(self, data: bytearray, set_dc: bool = False) -> None:
+    def _write(self, data: bytes | bytearray, set_dc: bool = False) -> None:
         """Handle writing data to SPI."""
         self.cs.on()
         self.dc(set_dc)
@@ -168,12 +137,13 @@ class Display(framebuf.FrameBuffer):
         self,
         *,
         command: int,
-        data: bytearray | list[int] | None = None,
+        data: bytes | bytearray | list[int] | None = None,
     ):
         """Write command and optionally data to SPI."""
-        self._write(bytearray([command]))
+        self._command[0] = command
+        self._write(self._command)
         if data:
-            if not isinstance(data, bytearray):
+            if isinstance(data, list):
                 data = bytearray(data)
             self._write(data, set_dc=True)
 
@@ -267,6 +237,51 @@ class Display(framebuf.FrameBuffer):
 
     def show(self):
         """Write framebuffer to display."""
-        self.write(command=DisplayCommand.CASET, data=[0x00, 0x28, 0x01, 0x17])
-        self.write(command=DisplayCommand.RASET, data=[0x00, 0x35, 0x00, 0xBB])
+        self.write(command=DisplayCommand.CASET, data=self.COLUMN_ADDRESS)
+        self.write(command=DisplayCommand.RASET, data=self.ROW_ADDRESS)
         self.write(command=DisplayCommand.RAMWR, data=self.buffer)
+
+    @property
+    def renderer(self) -> TextRenderer:
+        """Return text renderer, loading font atlas on first use."""
+        if self._renderer is None:
+            try:
+                font = Font.load(self.FONT_PATH)
+            except OSError:
+                font = Font.from_builtin()
+            self._renderer = TextRenderer(self, font)
+        return self._renderer
+
+    def draw_text(
+        self,
+        text: str,
+        x: int,
+        y: int,
+        colour: int = 0xFFFF,
+        size: int = 8,
+        background: int | None = None,
+    ) -> int:
+        """Draw text with font atlas, returning its width in pixels."""
+        return self.renderer.text(text, x, y, colour, size, background)
+
+    def draw_image(
+        self, buffer: bytearray, x: int, y: int, width: int, height: int
+    ) -> None:
+        """Draw image of panel-native pixels, e.g. from colour.convert_rgb888."""
+        self.blit(framebuf.FrameBuffer(buffer, width, height, framebuf.RGB565), x, y)
+
+    def draw_gradient(
+        self,
+        x: int,
+        y: int,
+        width: int,
+        height: int,
+        start: Colour = Colours.BLACK,
+        end: Colour = Colours.WHITE,
+    ) -> None:
+        """Draw horizontal gradient from start to end colour."""
+        row = framebuf.FrameBuffer(
+            gradient(start, end, width), width, 1, framebuf.RGB565
+        )
+        for offset in range(height):
+            self.blit(row, x, y + offset)
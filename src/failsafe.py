@@ -0,0 +1,117 @@
+import utime
+from machine import WDT, Timer
+
+from motor import Drive, DriveState
+
+
+class Failsafe:
+    """
+    Stop the drive when motion commands expire, and guard the main loop.
+
+    Each motion command may carry a lease in milliseconds, after which the
+    drive is ramped down and stopped unless a fresh command renews it.
+    Expiry is checked by a hardware timer, so the robot is stopped within
+    the lease plus one timer period and the ramp time, even if the main loop
+    stalls. If a watchdog is enabled, it is only fed whilst the main loop
+    reports a recent heartbeat, resetting the board if the loop hangs.
+    """
+
+    PERIOD_MS = 20
+    # Well within the range of utime.ticks_add
+    MAX_LEASE_MS = 1 << 28
+
+    def __init__(
+        self,
+        drive: Drive,
+        default_lease_ms: int | None = None,
+        ramp_ms: int = 200,
+        watchdog_ms: int | None = None,
+        heartbeat_ms: int = 500,
+    ) -> None:
+        """Initialise failsafe instance."""
+        self.drive = drive
+        self.default_lease_ms = default_lease_ms
+        self.ramp_ms = ramp_ms
+        self.watchdog_ms = watchdog_ms
+        self.heartbeat_ms = heartbeat_ms
+        self.expired = 0
+        self._deadline = None
+        self._setpoint = None
+        self._heartbeat = utime.ticks_ms()
+        self._timer = Timer()
+        self._watchdog = None
+
+    def lease(self, lease_ms: int | None = None) -> None:
+        """Renew lease of the current motion command, using the default if not given."""
+        if lease_ms is None:
+            lease_ms = self.default_lease_ms
+        self._restore()
+        if lease_ms is None or self.drive.state in (DriveState.STOP, DriveState.BRAKE):
+            self._deadline = None
+            return
+        lease_ms = int(min(max(lease_ms, 0), self.MAX_LEASE_MS))
+        self._deadline = utime.ticks_add(utime.ticks_ms(), lease_ms)
+
+    def release(self) -> None:
+        """Release lease, e.g. whilst a scripted motion is in control."""
+        self._restore()
+        self._deadline = None
+
+    @property
+    def remaining_ms(self) -> int | None:
+        """Return milliseconds until the lease expires, if any."""
+        if self._deadline is None:
+            return None
+        return utime.ticks_diff(self._deadline, utime.ticks_ms())
+
+    def heartbeat(self) -> None:
+        """Report that the main loop is healthy."""
+        self._heartbeat = utime.ticks_ms()
+
+    def start(self) -> None:
+        """Start checking leases and feeding the watchdog, if enabled."""
+        self._heartbeat = utime.ticks_ms()
+        if self.watchdog_ms is not None and self._watchdog is None:
+            # Once started, the watchdog cannot be stopped
+            self._watchdog = WDT(timeout=self.watchdog_ms)
+        self._timer.init(
+            mode=Timer.PERIODIC, period=self.PERIOD_MS, callback=self._check
+        )
+
+    def stop(self) -> None:
+        """Stop checking leases."""
+        self._timer.deinit()
+        self.release()
+
+    def _restore(self) -> None:
+        """Restore speed setpoint after a ramp down."""
+        if self._setpoint is not None:
+            self.drive.setpoint = self._setpoint
+            self._setpoint = None
+
+    def _check(self, _: Timer | None = None) -> None:
+        """Ramp down and stop drive once lease expires, and feed watchdog."""
+        now = utime.ticks_ms()
+        if self._watchdog is not None and (
+            utime.ticks_diff(now, self._heartbeat) < self.heartbeat_ms
+        ):
+            self._watchdog.feed()
+        if self._deadline is None:
+            return
+        if self.drive.state in (DriveState.STOP, DriveState.BRAKE):
+            # Keep any brake applied, e.g. by the governor or collision guard
+            self._restore()
+            self._deadline = None
+            return
+        overdue = utime.ticks_diff(now, self._deadline)
+        if overdue < 0:
+            return
+        if overdue < self.ramp_ms:
+            if self._setpoint is None:
+                self._setpoint = self.drive.setpoint
+            self.drive.setpoint = self._setpoint * (1 - overdue / self.ramp_ms)
+            return
+        self.drive.stop()
+        self._restore()
+        self._deadline = None
+        self.expired += 1
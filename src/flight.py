@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import struct
+
+import utime
+
+from flightlog import (
+    HEADER,
+    MAGIC,
+    NO_DISTANCE,
+    NO_POSITION,
+    RECORD,
+    RECORD_SIZE,
+    REPEAT,
+    VERSION,
+    Source,
+    command_id,
+    read_header,
+)
+from tracking import Tracking
+
+
+class FlightRecorder:
+    """
+    Record the state of a PicoGo each main loop iteration.
+
+    Fixed-size records are packed into a preallocated ring buffer in RAM,
+    holding the latest iterations, so the main loop never stalls on flash
+    writes. The buffer is only saved to flash on request, e.g. over
+    Bluetooth, or when recording stops. Saves rotate through a fixed number
+    of files, overwriting the oldest, and each file is headed by its run and
+    sequence number, so logs of the latest run can be ordered on the host.
+    """
+
+    BUFFER_SIZE = 16 * 1024
+    FILES = 4
+
+    def __init__(
+        self,
+        prefix: str = "flight",
+        tracking: Tracking | None = None,
+        buffer_size: int = BUFFER_SIZE,
+        files: int = FILES,
+    ) -> None:
+        """Initialise flight recorder instance."""
+        self.prefix = prefix
+        self.tracking = tracking
+        self.files = files
+        self.capacity = max(1, buffer_size // RECORD_SIZE)
+        self._buffer = bytearray(self.capacity * RECORD_SIZE)
+        self.run = 0
+        self.sequence = 0
+        self.written = 0
+        self._view = memoryview(self._buffer)
+        self._count = 0
+        self._next = 0
+        self._board = None
+        self._last = utime.ticks_us()
+        self._position = NO_POSITION
+        self._source = Source.NONE
+        self._command = 0
+        self._commands = 0
+
+    def path(self, index: int) -> str:
+        """Return path of log file at index."""
+        return f"{self.prefix}{index}.bin"
+
+    def flush(self) -> None:
+        """Save buffered records, oldest first, to the next log file in rotation."""
+        if not self._count:
+            return
+        offset = self._next * RECORD_SIZE
+        with open(self.path(self.sequence % self.files), "wb") as file:
+            file.write(
+                struct.pack(
+                    HEADER, MAGIC, VERSION, RECORD_SIZE, self.run, self.sequence
+                )
+            )
+            if self._count == self.capacity:
+                file.write(self._view[offset:])
+            file.write(self._view[:offset])
+        self.sequence += 1
+        self.written += self._count
+        self._count = 0
+        self._next = 0
+
+    def _received(self, source: int, command: int) -> None:
+        """Note a command received since the previous sample."""
+        self._source = source
+        self._command = command
+        self._commands = (self._commands + 1) & 0xFFFF
+
+    def start(self, board) -> None:
+        """Start recording board as a new run of log files."""
+        self._board = board
+        previous = [read_header(self.path(index)) for index in range(self.files)]
+        self.run = (
+            max((header[1] for header in previous if header), default=-1) + 1
+        ) & 0xFFFF
+        self.sequence = 0
+        self.written = 0
+        self._count = 0
+        self._next = 0
+        self._last = utime.ticks_us()
+
+        # Intercept commands on the board's instances
+        bluetooth = board.bluetooth
+        handle = bluetooth._handle
+
+        def recorded_handle(board, message, speed_increment, default_speed):
+            self._received(Source.BLUETOOTH, command_id(message))
+            return handle(board, message, speed_increment, default_speed)
+
+        bluetooth._handle = recorded_handle
+
+        remote = board.remote
+        get_key = remote.get_key
+
+        def recorded_get_key():
+            key = get_key()
+            if key is not None:
+                self._received(Source.REMOTE, REPEAT if key == "repeat" else key)
+            return key
+
+        remote.get_key = recorded_get_key
+
+        tracking = self.tracking
+        if tracking is not None:
+            read_line = tracking.read_line
+
+            def recorded_read_line(white_line=False, values=None):
+                result = read_line(white_line, values)
+                self._position = result[0]
+                return result
+
+            tracking.read_line = recorded_read_line
+
+    def sample(self, board) -> None:
+        """Append record of the board's current state, overwriting the oldest."""
+        now = utime.ticks_us()
+        motors = board.drive.motors
+        distance = board.rangefinder.distance_mm
+        struct.pack_into(
+            RECORD,
+            self._buffer,
+            self._next * RECORD_SIZE,
+            now & 0x3FFFFFFF,
+            utime.ticks_diff(now, self._last),
+            self._position,
+            motors.left.controls.speed.duty_u16(),
+            motors.right.controls.speed.duty_u16(),
+            board.drive.state,
+            self._source,
+            self._command,
+            self._commands,
+            int(distance) if distance < NO_DISTANCE else NO_DISTANCE,
+            board.battery.read_u16(),
+        )
+        self._last = now
+        self._source = Source.NONE
+        self._next = (self._next + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def stop(self) -> None:
+        """Save buffered records and restore intercepted methods."""
+        self.flush()
+        board = self._board
+        if board is not None:
+            # Remove instance attributes to restore methods
+            for instance, name in (
+                (board.bluetooth, "_handle"),
+                (board.remote, "get_key"),
+                (self.tracking, "read_line"),
+            ):
+                try:
+                    delattr(instance, name)
+                except AttributeError:
+                    pass
+            self._board = None
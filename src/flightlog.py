@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import struct
+from binascii import crc32
+
+# Fields of each record, in order, with their struct format
+FIELDS = (
+    ("time_us", "I"),  # ticks_us at sample, wrapping at 2**30
+    ("loop_us", "I"),  # microseconds since previous sample
+    ("position", "h"),  # Tracking.read_line position, or -1 if unknown
+    ("left", "H"),  # left motor duty
+    ("right", "H"),  # right motor duty
+    ("state", "B"),  # drive state
+    ("source", "B"),  # source of command received since previous sample
+    ("command", "H"),  # remote key, or command_id of Bluetooth message
+    ("commands", "H"),  # total commands received, wrapping at 2**16
+    ("distance_mm", "H"),  # cached sonar distance, or 0xFFFF if none
+    ("battery", "H"),  # raw battery reading
+)
+RECORD = "<" + "".join(code for _, code in FIELDS)
+RECORD_SIZE = struct.calcsize(RECORD)
+HEADER = "<4sHHHI"  # magic, version, record size, run, sequence
+HEADER_SIZE = struct.calcsize(HEADER)
+MAGIC = b"PGFR"
+VERSION = 2
+
+NO_POSITION = -1
+NO_DISTANCE = 0xFFFF
+REPEAT = 0xFFFF
+
+
+class Source:
+    """Enumeration of command sources."""
+
+    NONE = 0
+    BLUETOOTH = 1
+    REMOTE = 2
+
+
+def command_id(message) -> int:
+    """Return 16-bit identifier of a Bluetooth message, from its CRC-32."""
+    return crc32(message) & 0xFFFF
+
+
+def read_header(path: str) -> tuple[int, int, int] | None:
+    """Return record size, run and sequence of a flight log, if valid."""
+    try:
+        with open(path, "rb") as file:
+            header = file.read(HEADER_SIZE)
+    except OSError:
+        return None
+    if len(header) < HEADER_SIZE:
+        return None
+    magic, version, record_size, run, sequence = struct.unpack(HEADER, header)
+    if magic != MAGIC or version != VERSION:
+        return None
+    return record_size, run, sequence
@@ -0,0 +1,201 @@
+import struct
+from collections import OrderedDict
+
+import framebuf
+
+MAGIC = b"PGF1"
+HEADER = "<4sB"  # magic, number of sizes
+SIZE_HEADER = "<BBBB"  # width, height, first character, number of glyphs
+FIRST_CHARACTER = 0x20
+LAST_CHARACTER = 0x7E
+
+
+class Glyphs:
+    """
+    Atlas of monochrome glyphs of a single size.
+
+    Glyph bitmaps are stored contiguously in MONO_HLSB format, with a
+    FrameBuffer created once for each glyph over its region of the atlas.
+    """
+
+    def __init__(
+        self, width: int, height: int, first: int, count: int, data: bytearray
+    ) -> None:
+        """Initialise glyph atlas instance."""
+        self.width = width
+        self.height = height
+        self.first = first
+        self.count = count
+        self.data = data
+        self.stride = ((width + 7) // 8) * height
+        view = memoryview(self.data)
+        self.buffers = [
+            framebuf.FrameBuffer(
+                view[index * self.stride : (index + 1) * self.stride],
+                width,
+                height,
+                framebuf.MONO_HLSB,
+            )
+            for index in range(count)
+        ]
+
+    def get(self, character: str) -> framebuf.FrameBuffer | None:
+        """Return FrameBuffer of glyph for character, if in atlas."""
+        index = ord(character) - self.first
+        if 0 <= index < self.count:
+            return self.buffers[index]
+        return None
+
+
+class Font:
+    """Bitmap font with several sizes, keyed by glyph height."""
+
+    def __init__(self, sizes: list[Glyphs]) -> None:
+        """Initialise font instance."""
+        self.sizes = {glyphs.height: glyphs for glyphs in sizes}
+
+    def get(self, size: int) -> Glyphs:
+        """Return glyphs of given height, or the nearest smaller size."""
+        if size in self.sizes:
+            return self.sizes[size]
+        smaller = [height for height in self.sizes if height <= size]
+        return self.sizes[max(smaller) if smaller else min(self.sizes)]
+
+    @classmethod
+    def load(cls, path: str) -> "Font":
+        """
+        Load font from file.
+
+        The file begins with a header of magic and number of sizes. Each
+        size then has a header of glyph width, height, first character and
+        number of glyphs, followed by the MONO_HLSB bitmap of each glyph.
+        """
+        with open(path, "rb") as file:
+            magic, num_sizes = struct.unpack(HEADER, file.read(struct.calcsize(HEADER)))
+            if magic != MAGIC:
+                raise ValueError("Invalid font file")
+            sizes = []
+            for _ in range(num_sizes):
+                width, height, first, count = struct.unpack(
+                    SIZE_HEADER, file.read(struct.calcsize(SIZE_HEADER))
+                )
+                data = bytearray(((width + 7) // 8) * height * count)
+                file.readinto(data)
+                sizes.append(Glyphs(width, height, first, count, data))
+        return cls(sizes)
+
+    def save(self, path: str) -> None:
+        """Save font to file."""
+        with open(path, "wb") as file:
+            file.write(struct.pack(HEADER, MAGIC, len(self.sizes)))
+            for glyphs in self.sizes.values():
+                file.write(
+                    struct.pack(
+                        SIZE_HEADER,
+                        glyphs.width,
+                        glyphs.height,
+                        glyphs.first,
+                        glyphs.count,
+                    )
+                )
+                file.write(glyphs.data)
+
+    @classmethod
+    def from_builtin(cls, scales: tuple[int, ...] = (1, 2, 3)) -> "Font":
+        """Create font by scaling the built-in 8x8 framebuf font."""
+        count = LAST_CHARACTER - FIRST_CHARACTER + 1
+        source = framebuf.FrameBuffer(bytearray(8), 8, 8, framebuf.MONO_HLSB)
+        sizes = []
+        for scale in scales:
+            size = 8 * scale
+            glyphs = Glyphs(
+                size,
+                size,
+                FIRST_CHARACTER,
+                count,
+                bytearray(((size + 7) // 8) * size * count),
+            )
+            for index, glyph in enumerate(glyphs.buffers):
+                source.fill(0)
+                source.text(chr(FIRST_CHARACTER + index), 0, 0, 1)
+                for y in range(8):
+                    for x in range(8):
+                        if source.pixel(x, y):
+                            glyph.fill_rect(x * scale, y * scale, scale, scale, 1)
+            sizes.append(glyphs)
+        return cls(sizes)
+
+
+class TextRenderer:
+    """
+    Render text from a font atlas by blitting.
+
+    Rendered strings are cached as monochrome FrameBuffers, evicting the
+    least recently used once the cache exceeds its size in bytes.
+    """
+
+    def __init__(
+        self, target: framebuf.FrameBuffer, font: Font, cache_bytes: int = 8192
+    ) -> None:
+        """Initialise renderer instance."""
+        self.target = target
+        self.font = font
+        self.cache_bytes = cache_bytes
+        self._cache = OrderedDict()
+        self._cached_bytes = 0
+        self._palettes = {}
+
+    def _palette(
+        self, colour: int, background: int | None
+    ) -> tuple[framebuf.FrameBuffer, int]:
+        """Return palette for colours and transparent key, creating it once."""
+        key = (colour, background)
+        if key not in self._palettes:
+            palette = framebuf.FrameBuffer(bytearray(4), 2, 1, framebuf.RGB565)
+            transparent = -1 if background is not None else colour ^ 0x0001
+            palette.pixel(0, 0, background if background is not None else transparent)
+            palette.pixel(1, 0, colour)
+            self._palettes[key] = (palette, transparent)
+        return self._palettes[key]
+
+    def render(self, text: str, size: int = 8) -> tuple[framebuf.FrameBuffer, int, int]:
+        """Return monochrome FrameBuffer, width and height of rendered text."""
+        key = (text, size)
+        rendered = self._cache.pop(key, None)
+        if rendered is None:
+            glyphs = self.font.get(size)
+            width = glyphs.width * len(text)
+            height = glyphs.height
+            data = bytearray(((width + 7) // 8) * height)
+            buffer = framebuf.FrameBuffer(data, width, height, framebuf.MONO_HLSB)
+            for index, character in enumerate(text):
+                glyph = glyphs.get(character)
+                if glyph is not None:
+                    buffer.blit(glyph, index * glyphs.width, 0)
+            rendered = (buffer, width, height, len(data))
+            self._cached_bytes += len(data)
+            while self._cache and self._cached_bytes > self.cache_bytes:
+                self._cached_bytes -= self._cache.pop(next(iter(self._cache)))[3]
+        # Reinsert as most recently used
+        self._cache[key] = rendered
+        return rendered[:3]
+
+    def text(
+        self,
+        text: str,
+        x: int,
+        y: int,
+        colour: int = 0xFFFF,
+        size: int = 8,
+        background: int | None = None,
+    ) -> int:
+        """Draw text to target, returning its width in pixels."""
+        buffer, width, _ = self.render(text, size)
+        palette, transparent = self._palette(colour, background)
+        self.target.blit(buffer, x, y, transparent, palette)
+        return width
+
+    def clear(self) -> None:
+        """Clear cache of rendered text."""
+        self._cache.clear()
+        self._cached_bytes = 0
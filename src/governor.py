@@ -0,0 +1,63 @@
+from motor import Drive, DriveState
+from ranging import RangeFinder
+
+
+class SpeedGovernor:
+    """
+    Limit forward speed from the time to collision with obstacles ahead.
+
+    The cached sonar distance is dead-reckoned forward by the time since it
+    was measured, so the estimate stays bounded between pings. Forward speed
+    is progressively capped so that the time to collision stays above the
+    slowing threshold, braking only when it falls below the braking threshold.
+    """
+
+    # Forward speed at 100% duty, which should be calibrated for each robot
+    MAX_SPEED_MM_S = 500
+    PERIOD_MS = 50
+
+    def __init__(
+        self,
+        drive: Drive,
+        rangefinder: RangeFinder,
+        slow_s: float = 1.5,
+        brake_s: float = 0.3,
+        minimum_speed: float = 20,
+    ) -> None:
+        """Initialise governor instance."""
+        self.drive = drive
+        self.rangefinder = rangefinder
+        self.slow_s = slow_s
+        self.brake_s = brake_s
+        self.minimum_speed = minimum_speed
+
+    def velocity_mm_s(self) -> float:
+        """Return estimated forward velocity in mm/s."""
+        return self.drive.speed * self.MAX_SPEED_MM_S / 100
+
+    def distance_mm(self) -> float:
+        """Return distance to obstacle, dead-reckoned since last measurement."""
+        age = self.rangefinder.age_ms
+        if age is None:
+            return float("inf")
+        return self.rangefinder.distance_mm - self.velocity_mm_s() * age / 1000
+
+    def time_to_collision(self) -> float:
+        """Return seconds until collision at the current speed."""
+        velocity = self.velocity_mm_s()
+        if velocity <= 0:
+            return float("inf")
+        return max(self.distance_mm(), 0) / velocity
+
+    def update(self) -> None:
+        """Cap or brake forward speed, or release the cap when not driving forward."""
+        if self.drive.state != DriveState.FORWARD:
+            self.drive.limit = 100
+            return
+        if self.time_to_collision() <= self.brake_s:
+            self.drive.brake()
+            self.drive.limit = 100
+            return
+        # Highest speed keeping time to collision above slowing threshold
+        limit = max(self.distance_mm(), 0) / self.slow_s * 100 / self.MAX_SPEED_MM_S
+        self.drive.limit = max(limit, self.minimum_speed)
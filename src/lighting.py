@@ -0,0 +1,205 @@
+import math
+
+from machine import Timer
+
+from colour import Colour, Colours
+from display import NeoPixel
+from motor import DriveState
+from sensors import Battery
+
+DRIVE_STATE_COLOURS = {
+    DriveState.BACKWARD: Colours.WHITE,
+    DriveState.FORWARD: Colours.GREEN,
+    DriveState.BRAKE: Colours.RED,
+}
+
+
+def gamma_table(gamma: float = 2.8, brightness: float = 1.0) -> bytes:
+    """Return lookup table of 8-bit values corrected for gamma and brightness."""
+    return bytes(
+        round(((value / 255) ** gamma) * 255 * brightness) for value in range(256)
+    )
+
+
+class Animation:
+    """Sequence of precomputed NeoPixel frames, one per timer tick."""
+
+    def __init__(self, frames: list[bytes], loop: bool = True) -> None:
+        """Initialise animation instance."""
+        self.frames = frames
+        self.loop = loop
+
+
+class Animator:
+    """
+    Push precomputed NeoPixel animations from a hardware timer.
+
+    Frames are converted to the LED wire format once, with identical frames
+    sharing a single buffer, so a frame is only written when it changes.
+    Whilst running, the animator owns the NeoPixel buffer.
+    """
+
+    def __init__(
+        self,
+        neopixel: NeoPixel,
+        fps: int = 30,
+        brightness: float = 0.25,
+        gamma: float = 2.8,
+        left: tuple[int, ...] = (0, 1),
+        right: tuple[int, ...] = (2, 3),
+    ) -> None:
+        """Initialise animator instance and precompute status animations."""
+        self.neopixel = neopixel
+        self.fps = fps
+        self.left = left
+        self.right = right
+        self.table = gamma_table(gamma, brightness)
+        self._frames = {}
+        self._timer = Timer()
+        self._buffer = neopixel.buf
+        self._animation = None
+        self._index = 0
+        self._state = None
+
+        self.off = self.solid(Colours.BLACK)
+        self.states = {
+            state: self.solid(colour) for state, colour in DRIVE_STATE_COLOURS.items()
+        }
+        self.states[DriveState.LEFT] = self.indicator(self.left)
+        self.states[DriveState.RIGHT] = self.indicator(self.right)
+        self.gauges = [
+            self.solid(*self._gauge_colours(level))
+            for level in range(len(neopixel) + 1)
+        ]
+
+    def frame(self, colours: tuple[Colour, ...]) -> bytes:
+        """Return frame for colour of each LED, shared with identical frames."""
+        order = self.neopixel.ORDER
+        bpp = self.neopixel.bpp
+        frame = bytearray(len(colours) * bpp)
+        for index, colour in enumerate(colours):
+            for channel, value in enumerate(colour):
+                frame[index * bpp + order[channel]] = self.table[value]
+        frame = bytes(frame)
+        return self._frames.setdefault(frame, frame)
+
+    def _repeat(self, frame: bytes, seconds: float) -> list[bytes]:
+        """Return frame repeated to last for the given duration."""
+        return [frame] * max(1, round(seconds * self.fps))
+
+    def _gauge_colours(self, level: int) -> tuple[Colour, ...]:
+        """Return colours for a gauge with the given number of LEDs lit."""
+        if level <= 1:
+            colour = Colours.RED
+        elif level < len(self.neopixel):
+            colour = Colours.ORANGE
+        else:
+            colour = Colours.GREEN
+        return tuple(
+            colour if index < level else Colours.BLACK
+            for index in range(len(self.neopixel))
+        )
+
+    def solid(self, *colours: Colour) -> Animation:
+        """Return animation of a single colour, or one colour per LED."""
+        if len(colours) == 1:
+            colours *= len(self.neopixel)
+        return Animation([self.frame(colours)])
+
+    def indicator(
+        self,
+        pixels: tuple[int, ...],
+        colour: Colour = Colours.ORANGE,
+        period: float = 0.8,
+    ) -> Animation:
+        """Return animation blinking the given LEDs, e.g. as a turn indicator."""
+        on = self.frame(
+            tuple(
+                colour if index in pixels else Colours.BLACK
+                for index in range(len(self.neopixel))
+            )
+        )
+        off = self.frame((Colours.BLACK,) * len(self.neopixel))
+        return Animation(self._repeat(on, period / 2) + self._repeat(off, period / 2))
+
+    def breathing(self, colour: Colour, period: float = 2.0) -> Animation:
+        """Return animation fading all LEDs in and out."""
+        steps = max(2, round(period * self.fps))
+        frames = []
+        for step in range(steps):
+            level = (1 - math.cos(2 * math.pi * step / steps)) / 2
+            scaled = Colour(*(round(value * level) for value in colour))
+            frames.append(self.frame((scaled,) * len(self.neopixel)))
+        return Animation(frames)
+
+    def chase(
+        self,
+        colour: Colour,
+        background: Colour = Colours.BLACK,
+        period: float = 0.5,
+    ) -> Animation:
+        """Return animation moving a single lit LED around all LEDs."""
+        frames = []
+        for position in range(len(self.neopixel)):
+            frame = self.frame(
+                tuple(
+                    colour if index == position else background
+                    for index in range(len(self.neopixel))
+                )
+            )
+            frames.extend(self._repeat(frame, period / len(self.neopixel)))
+        return Animation(frames)
+
+    def gauge(self, percentage: float) -> Animation:
+        """Return precomputed gauge animation for percentage, e.g. battery charge."""
+        level = round(percentage * len(self.neopixel) / 100)
+        return self.gauges[max(0, min(level, len(self.neopixel)))]
+
+    def play(self, animation: Animation) -> None:
+        """Play animation from its first frame."""
+        self._index = 0
+        self._animation = animation
+
+    def notify(self, state: int, battery: Battery | None = None) -> None:
+        """
+        Play animation for drive state, if it has changed.
+
+        When stopped, the battery charge is shown as a gauge.
+        """
+        if state == self._state:
+            return
+        self._state = state
+        animation = self.states.get(state)
+        if animation is None:
+            animation = self.gauge(battery.percentage if battery is not None else 100)
+        self.play(animation)
+
+    def start(self) -> None:
+        """Start pushing frames at the configured frame rate."""
+        self._timer.init(mode=Timer.PERIODIC, freq=self.fps, callback=self._next_frame)
+
+    def stop(self) -> None:
+        """Stop animating, turn off LEDs and restore NeoPixel buffer."""
+        self._timer.deinit()
+        self._animation = None
+        self._state = None
+        self.neopixel.buf = self.off.frames[0]
+        self.neopixel.write()
+        self.neopixel.buf = self._buffer
+
+    def _next_frame(self, _: Timer | None = None) -> None:
+        """Write next frame of animation, skipping unchanged frames."""
+        animation = self._animation
+        if animation is None:
+            return
+        frames = animation.frames
+        if self._index >= len(frames):
+            if not animation.loop:
+                return
+            self._index = 0
+        frame = frames[self._index]
+        self._index += 1
+        if frame is self.neopixel.buf:
+            return
+        self.neopixel.buf = frame
+        self.neopixel.write()
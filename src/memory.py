@@ -0,0 +1,113 @@
+import gc
+
+import ujson
+import utime
+
+try:
+    mem_alloc = gc.mem_alloc
+    mem_free = gc.mem_free
+except AttributeError:
+    # Heap statistics are MicroPython extensions, e.g. missing on the host, so
+    # no allocations are recorded and collections are only periodic
+
+    def mem_alloc() -> int:
+        return 0
+
+    def mem_free() -> int:
+        return 1 << 30
+
+
+class GarbageCollector:
+    """
+    Schedule garbage collection outside of the control section.
+
+    Automatic collection is disabled whilst enabled, so that pauses only
+    occur in idle slots of the main loop, either periodically or when free
+    memory drops below a threshold.
+    """
+
+    def __init__(self, period_ms: int = 1000, threshold: int = 16384) -> None:
+        """Initialise garbage collector instance."""
+        self.period_ms = period_ms
+        self.threshold = threshold
+        self._deadline = utime.ticks_ms()
+
+    def enable(self) -> None:
+        """Disable automatic collection and collect immediately."""
+        gc.disable()
+        gc.collect()
+        self._deadline = utime.ticks_add(utime.ticks_ms(), self.period_ms)
+
+    def disable(self) -> None:
+        """Restore automatic collection."""
+        gc.enable()
+
+    def idle(self) -> bool:
+        """Collect garbage if due, returning whether a collection was made."""
+        now = utime.ticks_ms()
+        if mem_free() > self.threshold and utime.ticks_diff(now, self._deadline) < 0:
+            return False
+        gc.collect()
+        self._deadline = utime.ticks_add(now, self.period_ms)
+        return True
+
+
+class AllocationAudit:
+    """
+    Record heap allocations made by each callback.
+
+    Deltas of gc.mem_alloc() are only exact whilst automatic garbage
+    collection is disabled, e.g. when used with GarbageCollector.
+    """
+
+    def __init__(self) -> None:
+        """Initialise audit instance."""
+        self.callbacks = {}
+
+    def wrap(self, name: str, callback: callable) -> callable:
+        """Return callback wrapped to record its allocations."""
+        # calls, total bytes, maximum bytes
+        stats = self.callbacks[name] = [0, 0, 0]
+
+        # Callbacks take a single argument, the board or timer, and a fixed
+        # arity avoids allocating a tuple of arguments on each call
+        def audited(argument):
+            start = mem_alloc()
+            result = callback(argument)
+            allocated = mem_alloc() - start
+            if allocated < 0:  # collected during callback
+                allocated = 0
+            stats[0] += 1
+            stats[1] += allocated
+            if allocated > stats[2]:
+                stats[2] = allocated
+            return result
+
+        return audited
+
+    def reset(self) -> None:
+        """Clear all recorded allocations."""
+        for stats in self.callbacks.values():
+            stats[0] = stats[1] = stats[2] = 0
+
+    @property
+    def allocating(self) -> list[str]:
+        """Return names of callbacks which have allocated memory."""
+        return [name for name, stats in self.callbacks.items() if stats[2]]
+
+    def report(self) -> dict:
+        """Return report of allocations per callback."""
+        return {
+            name: {
+                "calls": calls,
+                "total": total,
+                "mean": round(total / calls, 1) if calls else 0.0,
+                "max": maximum,
+            }
+            for name, (calls, total, maximum) in self.callbacks.items()
+        }
+
+    def dump(self, stream) -> None:
+        """Write report to stream as a line of JSON, e.g. Bluetooth UART."""
+        stream.write(ujson.dumps(self.report()))
+        stream.write("\n")
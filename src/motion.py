@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import utime
+from machine import Timer
+
+import board
+
+
+class Primitive:
+    """
+    Base class for timed motion primitives.
+
+    Primitives begin once, then are updated until complete. Each update
+    returns the microseconds until it should next be updated, or None when
+    the primitive is complete.
+    """
+
+    POLL_US = 10_000
+
+    def begin(self, board: board.Board) -> None:
+        """Start primitive."""
+
+    def update(self, board: board.Board, elapsed_us: int) -> int | None:
+        """Update primitive, returning microseconds until next update or None."""
+        return None
+
+    def __repr__(self) -> str:
+        return self.__class__.__name__.lower()
+
+
+class Wait(Primitive):
+    """Wait for a duration, keeping the current motion."""
+
+    def __init__(self, duration_ms: int) -> None:
+        self.duration_us = int(duration_ms * 1000)
+
+    def update(self, board: board.Board, elapsed_us: int) -> int | None:
+        remaining = self.duration_us - elapsed_us
+        return remaining if remaining > 0 else None
+
+
+class Move(Wait):
+    """Drive in a direction at a speed for a duration, e.g. forwards at 60% for 500ms."""
+
+    DIRECTIONS = ("forward", "backward", "left", "right")
+
+    def __init__(self, direction: str, speed: float, duration_ms: int) -> None:
+        if direction not in self.DIRECTIONS:
+            raise ValueError(f"Invalid direction: {direction}")
+        super().__init__(duration_ms)
+        self.direction = direction
+        self.speed = speed
+
+    def begin(self, board: board.Board) -> None:
+        getattr(board.drive, self.direction)(self.speed)
+
+    def __repr__(self) -> str:
+        return self.direction
+
+
+class Arc(Wait):
+    """Drive forwards at separate speeds for each side for a duration."""
+
+    def __init__(self, left: float, right: float, duration_ms: int) -> None:
+        super().__init__(duration_ms)
+        self.left = left
+        self.right = right
+
+    def begin(self, board: board.Board) -> None:
+        board.drive.arc(self.left, self.right)
+
+
+class Ramp(Primitive):
+    """Ramp speed linearly to a target over a duration, stopping if the target is 0."""
+
+    def __init__(self, speed: float, duration_ms: int) -> None:
+        self.speed = speed
+        self.duration_us = int(duration_ms * 1000)
+        self._initial = 0.0
+
+    def begin(self, board: board.Board) -> None:
+        self._initial = board.drive.speed
+
+    def update(self, board: board.Board, elapsed_us: int) -> int | None:
+        if elapsed_us >= self.duration_us:
+            board.drive.setpoint = self.speed
+            if not self.speed:
+                board.drive.stop()
+            return None
+        fraction = elapsed_us / self.duration_us
+        board.drive.setpoint = self._initial + (self.speed - self._initial) * fraction
+        return min(self.POLL_US, self.duration_us - elapsed_us)
+
+
+class WaitUntil(Primitive):
+    """Wait until a condition of the board is met, e.g. Infrared.any, or a timeout."""
+
+    def __init__(self, condition: callable, timeout_ms: int | None = None) -> None:
+        self.condition = condition
+        self.timeout_us = None if timeout_ms is None else int(timeout_ms * 1000)
+
+    def update(self, board: board.Board, elapsed_us: int) -> int | None:
+        if self.condition(board):
+            return None
+        if self.timeout_us is not None and elapsed_us >= self.timeout_us:
+            return None
+        return self.POLL_US
+
+
+class Stop(Primitive):
+    """Stop all motors."""
+
+    def begin(self, board: board.Board) -> None:
+        board.drive.stop()
+
+
+class Brake(Primitive):
+    """Apply short brake to all motors."""
+
+    def begin(self, board: board.Board) -> None:
+        board.drive.brake()
+
+
+def _number(value) -> int | float:
+    """Return value if it is a number, e.g. a speed or duration."""
+    if not (isinstance(value, int) or isinstance(value, float)):
+        raise ValueError(f"Invalid number: {value}")
+    return value
+
+
+def parse(spec: list) -> Primitive:
+    """
+    Return primitive from its name and arguments, e.g. ["forward", 60, 500].
+
+    Primitives are:
+     - forward/backward/left/right, speed, duration_ms
+     - arc, left_speed, right_speed, duration_ms
+     - ramp, speed, duration_ms
+     - wait, duration_ms
+     - wait_infrared, [timeout_ms]
+     - stop
+     - brake
+
+    ValueError is raised for unknown names and non-numeric arguments.
+    """
+    if not isinstance(spec, list) or not spec:
+        raise ValueError(f"Invalid motion: {spec}")
+    name, arguments = spec[0], [_number(argument) for argument in spec[1:]]
+    if name in Move.DIRECTIONS:
+        return Move(name, *arguments)
+    elif name == "arc":
+        return Arc(*arguments)
+    elif name == "ramp":
+        return Ramp(*arguments)
+    elif name == "wait":
+        return Wait(*arguments)
+    elif name == "wait_infrared":
+        return WaitUntil(lambda board: board.infrared.any, *arguments)
+    elif name == "stop":
+        return Stop()
+    elif name == "brake":
+        return Brake()
+    raise ValueError(f"Invalid motion: {name}")
+
+
+class MotionQueue:
+    """
+    Execute queued motion primitives in the background.
+
+    Transitions are scheduled by a one-shot hardware timer with microsecond
+    resolution, with each primitive starting as soon as the previous one
+    completes, so the main loop stays responsive. Command leases are
+    released whilst primitives execute, and renewed once the queue drains,
+    so any motion left running is stopped by the failsafe.
+    """
+
+    CAPACITY = 32
+
+    def __init__(self, board: board.Board) -> None:
+        """Initialise motion queue instance."""
+        self.board = board
+        self.queue = []
+        self.current = None
+        self.completed = 0
+        self._started = 0
+        self._timer = Timer()
+        # Avoid allocating bound methods in timer callbacks
+        self._tick = self._run
+
+    @property
+    def active(self) -> bool:
+        """Return whether a primitive is executing."""
+        return self.current is not None
+
+    def enqueue(self, *primitives: Primitive) -> bool:
+        """Add primitives to queue, returning whether there was capacity."""
+        if len(self.queue) + len(primitives) > self.CAPACITY:
+            return False
+        self.queue.extend(primitives)
+        if self.current is None:
+            self._run()
+        return True
+
+    def preempt(self, *primitives: Primitive) -> bool:
+        """
+        Replace current and queued primitives with the given primitives.
+
+        The drive is stopped if no primitives replace them, including when
+        there is no capacity for them, returning whether they were queued.
+        """
+        self.cancel(stop=False)
+        queued = self.enqueue(*primitives)
+        if not primitives or not queued:
+            self.board.drive.stop()
+        return queued
+
+    def cancel(self, stop: bool = True) -> None:
+        """Clear current and queued primitives, stopping the drive by default."""
+        self._timer.deinit()
+        self.queue.clear()
+        self.current = None
+        if stop:
+            self.board.drive.stop()
+
+    def status(self) -> dict:
+        """Return status of queue."""
+        return {
+            "active": repr(self.current) if self.current is not None else None,
+            "elapsed": (
+                utime.ticks_diff(utime.ticks_us(), self._started) // 1000
+                if self.current is not None
+                else 0
+            ),
+            "queued": [repr(primitive) for primitive in self.queue],
+            "completed": self.completed,
+        }
+
+    def _run(self, _: Timer | None = None) -> None:
+        """Update current primitive, starting queued primitives as each completes."""
+        board = self.board
+        while True:
+            now = utime.ticks_us()
+            if self.current is None:
+                if not self.queue:
+                    return
+                self.current = self.queue.pop(0)
+                self._started = now
+                failsafe = getattr(board, "failsafe", None)
+                if failsafe is not None:
+                    failsafe.release()
+                self.current.begin(board)
+            delay = self.current.update(board, utime.ticks_diff(now, self._started))
+            if delay is not None:
+                self._timer.init(
+                    mode=Timer.ONE_SHOT,
+                    period=max(1, delay),
+                    tick_hz=1_000_000,
+                    callback=self._tick,
+                )
+                return
+            self.current = None
+            self.completed += 1
+            if not self.queue:
+                failsafe = getattr(board, "failsafe", None)
+                if failsafe is not None:
+                    failsafe.lease()
+                return
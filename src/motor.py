@@ -76,10 +76,21 @@ class Motor:
 
 
 class Drive:
-    """Handle a group of motors to provide drive."""
+    """
+    Handle a group of motors to provide drive.
+
+    The speed requested is kept as the setpoint, whilst motors are driven at
+    no more than the limit, e.g. as set by a speed governor. Each side is
+    driven at a ratio of the setpoint, so arcs keep their curvature whilst
+    the setpoint or limit changes.
+    """
 
     def __init__(self):
         """Initialise drive instance with motors."""
+        self._setpoint = 0.0
+        self._limit = 100.0
+        self._left_ratio = 1.0
+        self._right_ratio = 1.0
         self.motors = MotorGroup(
             left=Motor(
                 MotorControls(
@@ -121,29 +132,74 @@ class Drive:
 
     @speed.setter
     def speed(self, speed: float) -> None:
-        """Set speed of all motors as a percentage."""
-        for motor in self.motors:
-            motor.speed = speed
+        """Set speed of all motors as a percentage, up to the limit."""
+        self.setpoint = speed
+
+    @property
+    def setpoint(self) -> float:
+        """Return requested speed as a percentage."""
+        return self._setpoint
+
+    @setpoint.setter
+    def setpoint(self, speed: float) -> None:
+        """Set requested speed as a percentage, driving motors up to the limit."""
+        self._setpoint = min(max(speed, 0), 100)
+        speed = min(self._setpoint, self._limit)
+        self.motors.left.speed = speed * self._left_ratio
+        self.motors.right.speed = speed * self._right_ratio
+
+    @property
+    def limit(self) -> float:
+        """Return maximum speed of motors as a percentage."""
+        return self._limit
+
+    @limit.setter
+    def limit(self, limit: float) -> None:
+        """Set maximum speed of motors as a percentage, applying it immediately."""
+        limit = min(max(limit, 0), 100)
+        if limit != self._limit:
+            self._limit = limit
+            self.setpoint = self._setpoint
+
+    def _set(self, speed: float | None) -> None:
+        """Drive both sides equally, at speed if specified."""
+        self._left_ratio = self._right_ratio = 1.0
+        self.setpoint = self._setpoint if speed is None else speed
 
     def forward(self, speed: float | None = None) -> None:
         """Drive all motors forwards at specified speed."""
+        self._set(speed)
         for motor in self.motors:
-            motor.forward(speed)
+            motor.forward()
 
     def backward(self, speed: float | None = None) -> None:
         """Drive all motors backwards at specified speed."""
+        self._set(speed)
         for motor in self.motors:
-            motor.backward(speed)
+            motor.backward()
 
     def left(self, speed: float | None = None) -> None:
         """Turn left at specified speed."""
-        self.motors.right.forward(speed)
-        self.motors.left.backward(speed)
+        self._set(speed)
+        self.motors.right.forward()
+        self.motors.left.backward()
 
     def right(self, speed: float | None = None) -> None:
         """Turn right at specified speed."""
-        self.motors.left.forward(speed)
-        self.motors.right.backward(speed)
+        self._set(speed)
+        self.motors.left.forward()
+        self.motors.right.backward()
+
+    def arc(self, left: float, right: float) -> None:
+        """Drive forwards at separate speeds for each side, scaled down to the limit."""
+        left = min(max(left, 0), 100)
+        right = min(max(right, 0), 100)
+        fastest = max(left, right)
+        self._left_ratio = left / fastest if fastest else 1.0
+        self._right_ratio = right / fastest if fastest else 1.0
+        self.setpoint = fastest
+        for motor in self.motors:
+            motor.forward()
 
     def stop(self) -> None:
         """Stop all motors."""
@@ -0,0 +1,159 @@
+import ujson
+import utime
+
+from display import Display
+
+
+class Histogram:
+    """
+    Fixed-size histogram of durations in microseconds.
+
+    Bucket 0 holds zero durations, and bucket n holds durations in the range
+    [2 ** (n - 1), 2 ** n), with the final bucket collecting any overflow.
+    No memory is allocated when adding samples: the running total and its
+    weight are halved before leaving the small int range, keeping the mean.
+    """
+
+    BUCKETS = 24  # ~8.4s upper bound
+    MAXIMUM = 0x3FFFFFFF  # largest small int
+
+    def __init__(self) -> None:
+        """Initialise histogram instance."""
+        self.buckets = [0] * self.BUCKETS
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all samples."""
+        for index in range(self.BUCKETS):
+            self.buckets[index] = 0
+        self.count = 0
+        self.total = 0
+        self._weight = 0
+        self.minimum = self.MAXIMUM
+        self.maximum = 0
+
+    def add(self, value: int) -> None:
+        """Add duration in microseconds to histogram."""
+        index = 0
+        while value >> index and index < self.BUCKETS - 1:
+            index += 1
+        self.buckets[index] += 1
+        self.count += 1
+        if self.total > self.MAXIMUM - value:
+            self.total >>= 1
+            self._weight >>= 1
+        self.total += value
+        self._weight += 1
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+
+    @property
+    def mean(self) -> float:
+        """Return mean duration in microseconds."""
+        return self.total / self._weight if self._weight else 0.0
+
+    def percentile(self, fraction: float) -> int:
+        """Return upper bound of bucket containing the given fraction of samples."""
+        threshold = self.count * fraction
+        cumulative = 0
+        for index, count in enumerate(self.buckets):
+            cumulative += count
+            if count and cumulative >= threshold:
+                return min((1 << index) - 1, self.maximum)
+        return self.maximum
+
+    def summary(self) -> dict:
+        """Return summary of histogram."""
+        return {
+            "count": self.count,
+            "min": self.minimum if self.count else 0,
+            "mean": round(self.mean, 1),
+            "max": self.maximum,
+            "p99": self.percentile(0.99),
+        }
+
+
+class Profiler:
+    """
+    Record per-callback durations and main loop timing.
+
+    Callbacks are only wrapped when a profiler is enabled, so there is no
+    overhead when profiling is disabled.
+    """
+
+    def __init__(self) -> None:
+        """Initialise profiler instance."""
+        self.callbacks = {}
+        self.loop = Histogram()
+        self._last_tick = None
+
+    def wrap(self, name: str, callback: callable) -> callable:
+        """Return callback wrapped to record its duration."""
+        histogram = self.callbacks[name] = Histogram()
+
+        # Callbacks take a single argument, the board or timer, and a fixed
+        # arity avoids allocating a tuple of arguments on each call
+        def profiled(argument):
+            start = utime.ticks_us()
+            result = callback(argument)
+            histogram.add(utime.ticks_diff(utime.ticks_us(), start))
+            return result
+
+        return profiled
+
+    def tick(self) -> None:
+        """Record period of main loop, called once per iteration."""
+        now = utime.ticks_us()
+        if self._last_tick is not None:
+            self.loop.add(utime.ticks_diff(now, self._last_tick))
+        self._last_tick = now
+
+    def reset(self) -> None:
+        """Clear all recorded samples."""
+        self.loop.reset()
+        for histogram in self.callbacks.values():
+            histogram.reset()
+        self._last_tick = None
+
+    @property
+    def frequency(self) -> float:
+        """Return mean main loop frequency in Hz."""
+        return 1_000_000 / self.loop.mean if self.loop.count else 0.0
+
+    @property
+    def jitter(self) -> int:
+        """Return main loop jitter in microseconds, as p99 minus minimum period."""
+        if not self.loop.count:
+            return 0
+        return self.loop.percentile(0.99) - self.loop.minimum
+
+    def report(self) -> dict:
+        """Return report of all recorded timings."""
+        return {
+            "loop": self.loop.summary(),
+            "frequency": round(self.frequency, 1),
+            "jitter": self.jitter,
+            "callbacks": {
+                name: histogram.summary() for name, histogram in self.callbacks.items()
+            },
+        }
+
+    def dump(self, stream) -> None:
+        """Write report to stream as a line of JSON, e.g. Bluetooth UART."""
+        stream.write(ujson.dumps(self.report()))
+        stream.write("\n")
+
+    def show(self, display: Display) -> None:
+        """Show report on display."""
+        display.fill(0x0000)
+        display.text(f"Loop: {self.frequency:.0f}Hz +/-{self.jitter}us", 5, 5, 0xFFFF)
+        for index, (name, histogram) in enumerate(self.callbacks.items()):
+            display.text(
+                f"{name}: {histogram.mean:.0f}/{histogram.percentile(0.99)}us",
+                5,
+                15 + (index * 10),
+                0xFFFF,
+            )
+        display.show()
@@ -1,11 +1,15 @@
 import utime
-from machine import Pin
+from machine import Pin, time_pulse_us
+
+from motor import Drive, DriveState
+from sensors import Temperature
 
 
 class Sonar:
     """Control an HC-SR04 ultrasonic ranging module."""
 
     SPEED_OF_SOUND = 343  # m/s
+    TIMEOUT_US = 30000  # ~5m round trip
 
     def __init__(
         self,
@@ -20,27 +24,188 @@ class Sonar:
         self.echo.off()
         self.trigger.off()
 
-    def get_duration_us(self) -> int:
-        """Return duration in microseconds from sending ultrasonic pulse to returning."""
+    @staticmethod
+    def speed_of_sound(celsius: float | None = None) -> float:
+        """Return speed of sound in m/s, compensated for air temperature if given."""
+        if celsius is None:
+            return Sonar.SPEED_OF_SOUND
+        return 331.3 + 0.606 * celsius
+
+    @staticmethod
+    def timeout_us(range_mm: float) -> int:
+        """Return echo timeout in microseconds for objects up to the given range."""
+        return int(range_mm * 2000 / Sonar.SPEED_OF_SOUND)
+
+    def get_duration_us(self, timeout_us: int = TIMEOUT_US) -> int:
+        """
+        Return duration in microseconds from sending ultrasonic pulse to returning.
+
+        A negative value is returned if no echo is received within the timeout,
+        which bounds both the wait for the echo to start and its duration.
+        """
         self.trigger.on()
         utime.sleep_us(self.pulse_length_us)
         self.trigger.off()
-        while self.echo.value() == 0:
-            pass
-        start = utime.ticks_us()
-        while self.echo.value() == 1:
-            pass
-        end = utime.ticks_us()
-        return end - start
-
-    def get_distance_mm(self) -> float:
-        """Return distance in millimetres from object."""
-        duration = self.get_duration_us()
+        duration = time_pulse_us(self.echo, 1, timeout_us)
+        return duration if duration >= 0 else -1
+
+    def get_distance_mm(
+        self,
+        samples: int = 1,
+        celsius: float | None = None,
+        interval_us: int = 10000,
+        tolerance: float = 0.1,
+    ) -> float:
+        """
+        Return distance in millimetres from object.
+
+        Multiple pings may be taken, separated by an interval to let
+        echoes decay, and are filtered with filter_mm.
+        """
+        durations = []
+        for sample in range(samples):
+            if sample:
+                utime.sleep_us(interval_us)
+            durations.append(self.get_duration_us())
+        return self.filter_mm(durations, celsius, tolerance)
+
+    def filter_mm(
+        self,
+        durations: list[int],
+        celsius: float | None = None,
+        tolerance: float = 0.1,
+    ) -> float:
+        """
+        Return distance in millimetres from echo durations of several pings.
+
+        Pings further than the tolerance, as a fraction of the median, from
+        the median are rejected as outliers, and the remaining pings are
+        averaged. Infinity is returned if no echo is received.
+        """
+        durations = sorted(value for value in durations if value >= 0)
+        if not durations:
+            return float("inf")
+        median = durations[len(durations) // 2]
+        limit = max(median * tolerance, 30)  # ~5mm
+        inliers = [value for value in durations if abs(value - median) <= limit]
+        duration = sum(inliers) / len(inliers)
         # total mm: metres * 1000 = duration * (m/ms)
-        distance = (duration * (self.SPEED_OF_SOUND / 1000)) / 2
+        distance = (duration * (self.speed_of_sound(celsius) / 1000)) / 2
         return distance
 
 
+class RangeFinder:
+    """
+    Schedule filtered sonar measurements according to drive state and speed.
+
+    Pings are taken most often when driving forwards at speed, less often
+    when otherwise moving, and rarely when stopped. Each scheduled update
+    takes a single ping, filtered over a rolling window of the latest pings,
+    so the main loop is never blocked for a burst, and echoes are only
+    timed up to the maximum range, bounding each ping to a few milliseconds.
+    The latest distance is cached for other callbacks to use, timed from
+    the ping its median was taken from.
+    """
+
+    # Beyond the governor's slowing distance at full speed
+    MAX_RANGE_MM = 1000
+    MIN_INTERVAL_MS = 30
+    MOVING_INTERVAL_MS = 200
+    IDLE_INTERVAL_MS = 1000
+    TEMPERATURE_INTERVAL_MS = 10000
+
+    def __init__(
+        self,
+        sonar: Sonar,
+        temperature: Temperature | None = None,
+        samples: int = 3,
+        max_range_mm: float = MAX_RANGE_MM,
+    ) -> None:
+        """Initialise range finder instance."""
+        self.sonar = sonar
+        self.temperature = temperature
+        self.samples = samples
+        self.timeout_us = Sonar.timeout_us(max_range_mm)
+        self.distance_mm = float("inf")
+        self.celsius = None
+        self._measured = None
+        self._window = [-1] * samples
+        self._times = [0] * samples
+        self._index = 0
+        self._deadline = utime.ticks_ms()
+        self._temperature_deadline = self._deadline
+
+    def interval_ms(self, drive: Drive) -> int:
+        """Return interval between measurements for the drive's state and speed."""
+        state = drive.state
+        if state == DriveState.FORWARD:
+            return self.MOVING_INTERVAL_MS - int(
+                (self.MOVING_INTERVAL_MS - self.MIN_INTERVAL_MS) * drive.speed / 100
+            )
+        elif state in (DriveState.BACKWARD, DriveState.LEFT, DriveState.RIGHT):
+            return self.MOVING_INTERVAL_MS
+        return self.IDLE_INTERVAL_MS
+
+    @property
+    def age_ms(self) -> int | None:
+        """Return milliseconds since last measurement, if any."""
+        if self._measured is None:
+            return None
+        return utime.ticks_diff(utime.ticks_ms(), self._measured)
+
+    def _update_temperature(self) -> None:
+        """Read air temperature if due."""
+        now = utime.ticks_ms()
+        if self.temperature is not None and (
+            self.celsius is None
+            or utime.ticks_diff(now, self._temperature_deadline) >= 0
+        ):
+            self.celsius = self.temperature.celsius
+            self._temperature_deadline = utime.ticks_add(
+                now, self.TEMPERATURE_INTERVAL_MS
+            )
+
+    def measure(self) -> float:
+        """Take a filtered burst of pings now, returning distance in millimetres."""
+        self._update_temperature()
+        self.distance_mm = self.sonar.get_distance_mm(self.samples, self.celsius)
+        self._measured = utime.ticks_ms()
+        return self.distance_mm
+
+    def ping(self) -> float:
+        """Take a single ping, returning distance filtered over the latest pings."""
+        self._update_temperature()
+        window = self._window
+        window[self._index] = self.sonar.get_duration_us(self.timeout_us)
+        self._times[self._index] = utime.ticks_ms()
+        self._index = (self._index + 1) % len(window)
+        self.distance_mm = self.sonar.filter_mm(window, self.celsius)
+        # Time distance from the ping at the median, as chosen by filter_mm
+        echoes = sorted(
+            (index for index in range(len(window)) if window[index] >= 0),
+            key=lambda index: window[index],
+        )
+        median = echoes[len(echoes) // 2] if echoes else self._index - 1
+        self._measured = self._times[median]
+        return self.distance_mm
+
+    def get_distance_mm(self, max_age_ms: int = 0) -> float:
+        """Return cached distance if recent enough, otherwise measure now."""
+        age = self.age_ms
+        if age is None or age > max_age_ms:
+            return self.measure()
+        return self.distance_mm
+
+    def update(self, drive: Drive) -> bool:
+        """Ping if due for the drive's state, returning whether pinged."""
+        now = utime.ticks_ms()
+        if utime.ticks_diff(now, self._deadline) < 0:
+            return False
+        self.ping()
+        self._deadline = utime.ticks_add(now, self.interval_ms(drive))
+        return True
+
+
 class Infrared:
     """Read ST188 reflective photointerrupters with LM393 differential comparator."""
 
@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 import utime
 from machine import Pin
 
@@ -30,6 +32,17 @@ class Key:
     NUMBER_9 = 0x4A
 
 
+# Keys which drive the board, with their repeat codes renewing its lease
+MOTION_KEYS = (
+    Key.NUMBER_0,
+    Key.NUMBER_2,
+    Key.NUMBER_4,
+    Key.NUMBER_5,
+    Key.NUMBER_6,
+    Key.NUMBER_8,
+)
+
+
 class Remote(Pin):
     """
     Class to handle infrared remote control.
@@ -39,9 +52,10 @@ class Remote(Pin):
 
     def __init__(self, pin_id: int = 5) -> None:
         super().__init__(pin_id, Pin.IN)
+        self.last_key = None
 
     def get_key(self):
-        """Get key code from IR sensor."""
+        """Get key code from IR sensor, "repeat" for a repeat code, or None."""
         if self.value() == 1:  # No data
             return None
 
@@ -55,6 +69,8 @@ class Remote(Pin):
         while (self.value() == 1) and (count < 50):  # 4.5ms - Silence
             count += 1
             utime.sleep_us(100)
+        if count < 30:  # 2.25ms - Repeat code
+            return "repeat"
         idx = 0
         cnt = 0
         data = [0, 0, 0, 0]  # 8-bit address and command
@@ -77,7 +93,7 @@ class Remote(Pin):
         if data[0] + data[1] == 0xFF and data[2] + data[3] == 0xFF:  # check
             return data[2]
         else:
-            return "repeat"
+            return None
 
     def callback(
         self,
@@ -89,7 +105,13 @@ class Remote(Pin):
         key = self.get_key()
         if key is None:
             return
-        elif key == Key.NUMBER_0:
+        # Repeat codes only renew the lease whilst a motion key is held
+        if key == "repeat":
+            motion = self.last_key in MOTION_KEYS
+        else:
+            self.last_key = key
+            motion = key in MOTION_KEYS
+        if key == Key.NUMBER_0:
             board.drive.brake()
         elif key == Key.NUMBER_2:
             board.drive.forward()
@@ -104,8 +126,16 @@ class Remote(Pin):
         elif key == Key.EQ:
             board.drive.speed = default_speed
         elif key == Key.VOLUME_UP:
-            board.drive.speed += speed_increment
+            board.drive.setpoint += speed_increment
         elif key == Key.VOLUME_DOWN:
-            board.drive.speed -= speed_increment
+            board.drive.setpoint -= speed_increment
         elif key == Key.PLAY_PAUSE:
             board.buzzer.toggle()
+
+        # Manual commands take over from queued motion
+        queue = getattr(board, "motion", None)
+        if queue is not None and motion:
+            queue.cancel(stop=False)
+        failsafe = getattr(board, "failsafe", None)
+        if failsafe is not None and motion:
+            failsafe.lease()
@@ -0,0 +1,432 @@
+import struct
+from array import array
+
+import utime
+from machine import Pin
+
+from board import PicoGo
+from ranging import Sonar
+from tracking import Tracking
+
+try:
+    from binascii import crc32
+except ImportError:
+    crc32 = None
+
+RECORD = "<IBH"  # time in microseconds, channel, payload length
+RECORD_SIZE = struct.calcsize(RECORD)
+
+
+class Channel:
+    """Enumeration of trace channels."""
+
+    # Inputs
+    UART = 0  # bytes read
+    REMOTE = 1  # pin level at edge
+    INFRARED = 2  # left and right pin levels
+    SONAR = 3  # echo duration in microseconds
+    TRACKING = 4  # ADC frame
+    # Outputs
+    MOTOR = 16  # left duty, right duty, drive state
+    DISPLAY = 17  # CRC32 of framebuffer on show
+
+    OUTPUTS = (MOTOR, DISPLAY)
+
+
+def read_trace(path: str) -> list[tuple[int, int, bytes]]:
+    """Return records of time, channel and payload from trace file."""
+    records = []
+    with open(path, "rb") as file:
+        while True:
+            header = file.read(RECORD_SIZE)
+            if len(header) < RECORD_SIZE:
+                break
+            time, channel, length = struct.unpack(RECORD, header)
+            records.append((time, channel, file.read(length)))
+    return records
+
+
+def write_trace(path: str, records: list[tuple[int, int, bytes]]) -> None:
+    """Write records of time, channel and payload to trace file."""
+    with open(path, "wb") as file:
+        for time, channel, payload in records:
+            file.write(struct.pack(RECORD, time, channel, len(payload)))
+            file.write(payload)
+
+
+class Recorder:
+    """
+    Record external inputs and resulting outputs of a PicoGo to a trace.
+
+    Inputs are intercepted on the board's instances, with IR edges captured
+    by a hard interrupt into a preallocated buffer. Outputs are sampled once
+    per main loop iteration. Records are buffered in memory and written to
+    the trace file in blocks.
+    """
+
+    BLOCK_SIZE = 4096
+    EDGES = 256
+
+    def __init__(self, path: str) -> None:
+        """Initialise recorder instance."""
+        self.path = path
+        self._file = None
+        self._buffer = bytearray()
+        self._last = utime.ticks_us()
+        self._elapsed = 0
+        self._edge_times = array("I", [0] * self.EDGES)
+        self._edge_levels = bytearray(self.EDGES)
+        self._edge_count = 0
+        self._motors = None
+        self._board = None
+        self._tracking = None
+
+    def record(self, channel: int, payload: bytes) -> None:
+        """Append record to trace at the current time."""
+        self.record_at(utime.ticks_us(), channel, payload)
+
+    def _elapsed_at(self, ticks: int) -> int:
+        """
+        Return microseconds since recording started at the given time in ticks.
+
+        Elapsed time is accumulated from successive tick differences, so
+        traces may be longer than the ticks period, and ticks captured
+        earlier, e.g. by the IR interrupt, are timed correctly.
+        """
+        delta = utime.ticks_diff(ticks, self._last)
+        if delta <= 0:
+            return self._elapsed + delta
+        self._last = ticks
+        self._elapsed += delta
+        return self._elapsed
+
+    def record_at(self, ticks: int, channel: int, payload: bytes) -> None:
+        """Append record to trace at the given time in ticks."""
+        time = self._elapsed_at(ticks) & 0xFFFFFFFF
+        self._buffer.extend(struct.pack(RECORD, time, channel, len(payload)))
+        self._buffer.extend(payload)
+        if len(self._buffer) >= self.BLOCK_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered records to trace file."""
+        if self._file is not None and self._buffer:
+            self._file.write(self._buffer)
+            self._buffer = bytearray()
+
+    def _edge(self, pin: Pin) -> None:
+        """Store IR edge without allocating, for use as a hard interrupt."""
+        if self._edge_count < self.EDGES:
+            # Ticks fit a small int, whereas ticks shifted to hold the level may not
+            self._edge_times[self._edge_count] = utime.ticks_us()
+            self._edge_levels[self._edge_count] = pin.value()
+            self._edge_count += 1
+
+    def attach(self, board: PicoGo, tracking: Tracking | None = None) -> None:
+        """Start recording inputs and outputs of board."""
+        self._board = board
+        self._tracking = tracking
+        self._file = open(self.path, "wb")
+        self._last = utime.ticks_us()
+        self._elapsed = 0
+
+        bluetooth = board.bluetooth
+        readinto = bluetooth.readinto
+
+        def recorded_readinto(buffer, nbytes=None):
+            count = readinto(buffer, nbytes)
+            if count:
+                self.record(Channel.UART, bytes(buffer[:count]))
+            return count
+
+        bluetooth.readinto = recorded_readinto
+
+        board.remote.irq(self._edge, Pin.IRQ_RISING | Pin.IRQ_FALLING, hard=True)
+
+        infrared = board.infrared
+        for pin in (infrared._left, infrared._right):
+            pin.irq(
+                lambda _: self.record(
+                    Channel.INFRARED,
+                    bytes((infrared._left.value(), infrared._right.value())),
+                ),
+                Pin.IRQ_RISING | Pin.IRQ_FALLING,
+            )
+        self.record(
+            Channel.INFRARED, bytes((infrared._left.value(), infrared._right.value()))
+        )
+
+        sonar = board.sonar
+        get_duration_us = sonar.get_duration_us
+
+        def recorded_get_duration_us(timeout_us=Sonar.TIMEOUT_US):
+            duration = get_duration_us(timeout_us)
+            self.record(Channel.SONAR, struct.pack("<i", duration))
+            return duration
+
+        sonar.get_duration_us = recorded_get_duration_us
+
+        if tracking is not None:
+            analog_read = tracking.analog_read
+
+            def recorded_analog_read(values=None, first=0, last=None):
+                values = analog_read(values, first, last)
+                self.record(Channel.TRACKING, struct.pack(f"<{len(values)}H", *values))
+                return values
+
+            tracking.analog_read = recorded_analog_read
+
+        record_outputs(self, board)
+
+    def sample(self, board: PicoGo) -> None:
+        """Flush captured IR edges and record changes of motor outputs."""
+        if self._edge_count:
+            for index in range(self._edge_count):
+                self.record_at(
+                    self._edge_times[index],
+                    Channel.REMOTE,
+                    bytes((self._edge_levels[index],)),
+                )
+            self._edge_count = 0
+        # Keep elapsed time current whilst nothing is recorded
+        self._elapsed_at(utime.ticks_us())
+        motors = motor_outputs(board)
+        if motors != self._motors:
+            self._motors = motors
+            self.record(Channel.MOTOR, motors)
+
+    def detach(self) -> None:
+        """Stop recording and close trace file."""
+        board = self._board
+        if board is not None:
+            board.remote.irq(None)
+            board.infrared._left.irq(None)
+            board.infrared._right.irq(None)
+            # Remove instance attributes to restore methods
+            for instance, name in (
+                (board.bluetooth, "readinto"),
+                (board.sonar, "get_duration_us"),
+                (board.display, "show"),
+                (self._tracking, "analog_read"),
+            ):
+                try:
+                    delattr(instance, name)
+                except AttributeError:
+                    pass
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def motor_outputs(board: PicoGo) -> bytes:
+    """Return packed motor duties and drive state."""
+    motors = board.drive.motors
+    return struct.pack(
+        "<HHB",
+        motors.left.controls.speed.duty_u16(),
+        motors.right.controls.speed.duty_u16(),
+        board.drive.state,
+    )
+
+
+def record_outputs(recorder: "Recorder | Player", board: PicoGo) -> None:
+    """Record display updates, and sample motor outputs each loop iteration."""
+    display = board.display
+    show = display.show
+
+    def recorded_show():
+        show()
+        if crc32 is not None:
+            recorder.record(Channel.DISPLAY, struct.pack("<I", crc32(display.buffer)))
+
+    display.show = recorded_show
+    board.add_callback("recorder", recorder.sample)
+
+
+class _ReplayPin:
+    """Input pin whose level is replayed from a trace."""
+
+    def __init__(self, level: callable) -> None:
+        self._level = level
+
+    def value(self, value: int | None = None) -> int:
+        return self._level()
+
+    def irq(self, *args, **kwargs) -> None:
+        pass
+
+
+class Player:
+    """
+    Replay recorded inputs of a trace through a PicoGo, recording its outputs.
+
+    Inputs are released when the time since attaching reaches their recorded
+    time. Sonar and tracking readings are returned in recorded order. The
+    main loop is stopped once all inputs have been replayed.
+    """
+
+    def __init__(
+        self, records: list[tuple[int, int, bytes]], settle_us: int = 100_000
+    ) -> None:
+        """Initialise player instance."""
+        self.inputs = {}
+        for time, channel, payload in records:
+            if channel not in Channel.OUTPUTS:
+                self.inputs.setdefault(channel, []).append((time, payload))
+        self.end = max((time for time, _, _ in records), default=0) + settle_us
+        self.outputs = []
+        self._uart = bytearray()
+        self._positions = {}
+        self._edge_positions = {}
+        self._motors = None
+        self._last = utime.ticks_us()
+        self._elapsed = 0
+
+    @property
+    def elapsed(self) -> int:
+        """Return microseconds since replay started, accumulated across ticks periods."""
+        now = utime.ticks_us()
+        self._elapsed += utime.ticks_diff(now, self._last)
+        self._last = now
+        return self._elapsed
+
+    def _release(self, channel: int) -> bytes | None:
+        """Return payloads of channel due at the current time, concatenated."""
+        records = self.inputs.get(channel, ())
+        position = self._positions.get(channel, 0)
+        elapsed = self.elapsed
+        released = None
+        while position < len(records) and records[position][0] <= elapsed:
+            released = (released or b"") + records[position][1]
+            position += 1
+        self._positions[channel] = position
+        return released
+
+    def _next(self, channel: int) -> bytes | None:
+        """Return next payload of channel in recorded order."""
+        records = self.inputs.get(channel, ())
+        position = self._positions.get(channel, 0)
+        if position >= len(records):
+            return None
+        self._positions[channel] = position + 1
+        return records[position][1]
+
+    def _level(self, channel: int, index: int, default: int = 1) -> int:
+        """Return level at the current time from edge records of channel."""
+        records = self.inputs.get(channel, ())
+        position = self._edge_positions.get(channel, 0)
+        elapsed = self.elapsed
+        while position < len(records) and records[position][0] <= elapsed:
+            position += 1
+        self._edge_positions[channel] = position
+        return records[position - 1][1][index] if position else default
+
+    def record(self, channel: int, payload: bytes) -> None:
+        """Append output record at the current time."""
+        self.outputs.append((self.elapsed, channel, payload))
+
+    def sample(self, board: PicoGo) -> None:
+        """Record changes of motor outputs, stopping board when replay ends."""
+        motors = motor_outputs(board)
+        if motors != self._motors:
+            self._motors = motors
+            self.record(Channel.MOTOR, motors)
+        if self.elapsed >= self.end:
+            board.stop()
+
+    def trace(self) -> list[tuple[int, int, bytes]]:
+        """Return replayed inputs and recorded outputs as trace records."""
+        records = [
+            (time, channel, payload)
+            for channel, inputs in self.inputs.items()
+            for time, payload in inputs
+        ]
+        records.extend(self.outputs)
+        return sorted(records, key=lambda record: record[0])
+
+    def attach(self, board: PicoGo, tracking: Tracking | None = None) -> None:
+        """Replace inputs of board with replayed inputs."""
+        self._last = utime.ticks_us()
+        self._elapsed = 0
+
+        def any():
+            released = self._release(Channel.UART)
+            if released:
+                self._uart.extend(released)
+            return len(self._uart)
+
+        def readinto(buffer, nbytes=None):
+            count = min(len(self._uart), len(buffer), nbytes or len(buffer))
+            buffer[:count] = self._uart[:count]
+            self._uart = self._uart[count:]
+            return count
+
+        board.bluetooth.any = any
+        board.bluetooth.readinto = readinto
+        board.remote.value = lambda value=None: self._level(Channel.REMOTE, 0)
+        board.infrared._left = _ReplayPin(lambda: self._level(Channel.INFRARED, 0))
+        board.infrared._right = _ReplayPin(lambda: self._level(Channel.INFRARED, 1))
+
+        def get_duration_us(timeout_us=None):
+            payload = self._next(Channel.SONAR)
+            return struct.unpack("<i", payload)[0] if payload else -1
+
+        board.sonar.get_duration_us = get_duration_us
+
+        if tracking is not None:
+
+            def analog_read(values=None, first=0, last=None):
+                payload = self._next(Channel.TRACKING)
+                if values is None:
+                    values = [0] * len(tracking.sensors)
+                if payload:
+                    for index, value in enumerate(
+                        struct.unpack(f"<{len(payload) // 2}H", payload)
+                    ):
+                        values[index] = value
+                return values
+
+            tracking.analog_read = analog_read
+
+        record_outputs(self, board)
+
+
+def compare(
+    expected: list[tuple[int, int, bytes]], actual: list[tuple[int, int, bytes]]
+) -> dict:
+    """Compare sequences of outputs of two traces, ignoring their timing."""
+    expected = [(channel, payload) for _, channel, payload in expected]
+    actual = [(channel, payload) for _, channel, payload in actual]
+    expected = [record for record in expected if record[0] in Channel.OUTPUTS]
+    actual = [record for record in actual if record[0] in Channel.OUTPUTS]
+    mismatch = None
+    for index, (left, right) in enumerate(zip(expected, actual)):
+        if left != right:
+            mismatch = index
+            break
+    if mismatch is None and len(expected) != len(actual):
+        mismatch = min(len(expected), len(actual))
+    return {
+        "expected": len(expected),
+        "actual": len(actual),
+        "match": mismatch is None,
+        "first_mismatch": mismatch,
+    }
+
+
+def latencies(records: list[tuple[int, int, bytes]]) -> list[int]:
+    """
+    Return microseconds from each received command to the motor change it caused.
+
+    Commands without a motor change before the next command are ignored.
+    """
+    results = []
+    pending = None
+    for time, channel, _ in sorted(records, key=lambda record: record[0]):
+        if channel == Channel.UART:
+            pending = time
+        elif channel == Channel.MOTOR and pending is not None:
+            results.append(time - pending)
+            pending = None
+    return results
@@ -1,15 +1,152 @@
 import utime
-from machine import Pin
+from machine import PWM, Pin, Timer
+
+from motor import DriveState
+
+NOTE_NAMES = ("C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B")
+# Equal temperament frequencies in Hz, e.g. NOTES["A4"] == 440
+NOTES = {
+    f"{name}{octave}": round(440 * 2 ** ((octave * 12 + index - 57) / 12))
+    for octave in range(3, 8)
+    for index, name in enumerate(NOTE_NAMES)
+}
+REST = 0
+
+
+class Melody:
+    """Sequence of notes, compiled to frequencies and durations once."""
+
+    def __init__(self, *notes: tuple[str | int, int], loop: bool = False) -> None:
+        """
+        Initialise melody from pairs of note and duration in milliseconds.
+
+        Notes may be given by name, e.g. "C5", frequency in Hz or REST.
+        """
+        self.notes = tuple(
+            (NOTES[note] if isinstance(note, str) else note, duration)
+            for note, duration in notes
+        )
+        self.loop = loop
+
+    @property
+    def duration_ms(self) -> int:
+        """Return total duration of melody in milliseconds."""
+        return sum(duration for _, duration in self.notes)
+
+
+class Melodies:
+    """Enumeration of melodies and alert patterns."""
+
+    STARTUP = Melody(("C5", 80), ("E5", 80), ("G5", 80), ("C6", 160))
+    ALERT = Melody(("A5", 100), (REST, 50), ("A5", 100), (REST, 50), ("A5", 100))
+    LOW_BATTERY = Melody(("E5", 200), ("C5", 400))
+    FORWARD = Melody(("C6", 40))
+    BACKWARD = Melody(("C5", 40))
+    LEFT = Melody(("E5", 30), ("G5", 30))
+    RIGHT = Melody(("G5", 30), ("E5", 30))
+    STOP = Melody(("G4", 60))
+    BRAKE = Melody(("C4", 120))
+
+
+DRIVE_STATE_MELODIES = {
+    DriveState.STOP: Melodies.STOP,
+    DriveState.BACKWARD: Melodies.BACKWARD,
+    DriveState.FORWARD: Melodies.FORWARD,
+    DriveState.BRAKE: Melodies.BRAKE,
+    DriveState.LEFT: Melodies.LEFT,
+    DriveState.RIGHT: Melodies.RIGHT,
+}
 
 
 class Buzzer(Pin):
-    """Handle the buzzer device."""
+    """
+    Handle the buzzer device.
+
+    Tones are produced with PWM and sequenced by a hardware timer, so
+    playback never blocks the caller.
+    """
+
+    DUTY = 0x8000
 
     def __init__(self, pin_id: int = 4) -> None:
         super().__init__(pin_id, Pin.OUT)
+        self._pin_id = pin_id
+        self._pwm = None
+        self._timer = Timer()
+        self._melody = None
+        self._index = 0
+        self._state = None
+        # Avoid allocating bound methods in timer callbacks
+        self._next = self._next_note
+        self._silence = lambda _: self.stop()
 
-    def beep(self, time_ms: int = 150) -> None:
-        """Sound the beeper for the given amount of milliseconds."""
-        self.on()
-        utime.sleep_ms(time_ms)
+    @property
+    def playing(self) -> bool:
+        """Return whether a melody is playing."""
+        return self._melody is not None
+
+    def tone(self, frequency: int) -> None:
+        """Sound the buzzer at the given frequency in Hz, or silence it with REST."""
+        if self._pwm is None:
+            # rp2 PWM only accepts exact Pin instances, not subclasses
+            self._pwm = PWM(Pin(self._pin_id))
+        if frequency == REST:
+            self._pwm.duty_u16(0)
+            return
+        self._pwm.freq(frequency)
+        self._pwm.duty_u16(self.DUTY)
+
+    def stop(self) -> None:
+        """Stop playback and return pin to digital output."""
+        self._timer.deinit()
+        self._melody = None
+        if self._pwm is not None:
+            self._pwm.deinit()
+            self._pwm = None
+            self.init(Pin.OUT)
         self.off()
+
+    def play(self, melody: Melody) -> None:
+        """Start playing melody in the background, replacing any current melody."""
+        self.stop()
+        self._melody = melody
+        self._index = 0
+        self._next_note()
+
+    def _next_note(self, _: Timer | None = None) -> None:
+        """Play next note of melody, scheduling the following note."""
+        melody = self._melody
+        if melody is None:
+            return
+        if self._index >= len(melody.notes):
+            if not melody.loop:
+                self.stop()
+                return
+            self._index = 0
+        frequency, duration = melody.notes[self._index]
+        self._index += 1
+        self.tone(frequency)
+        self._timer.init(mode=Timer.ONE_SHOT, period=duration, callback=self._next)
+
+    def notify(self, state: int) -> None:
+        """Play melody mapped to drive state, if it has changed."""
+        if state == self._state:
+            return
+        self._state = state
+        melody = DRIVE_STATE_MELODIES.get(state)
+        if melody is not None:
+            self.play(melody)
+
+    def beep(self, time_ms: int = 150, wait: bool = False) -> None:
+        """
+        Sound the beeper for the given amount of milliseconds.
+
+        The beeper is silenced by a timer, unless waiting is requested.
+        """
+        self.stop()
+        self.on()
+        if wait:
+            utime.sleep_ms(time_ms)
+            self.off()
+            return
+        self._timer.init(mode=Timer.ONE_SHOT, period=time_ms, callback=self._silence)
@@ -0,0 +1,213 @@
+import struct
+from array import array
+from binascii import crc32
+
+import utime
+from machine import UART
+
+from display import Display
+
+SYNC = b"\xa5\x5a"
+HEADER = "<2sBHI"  # sync, packet type, payload length, CRC32 of payload
+HEADER_SIZE = struct.calcsize(HEADER)
+FRAME = "<HHHB"  # frame number, width, height, tile size
+TILE = "<BB"  # tile column and row
+MAX_RUN = 255
+
+
+class Packet:
+    """Enumeration of stream packet types."""
+
+    FRAME = 0  # start of frame
+    RAW = 1  # tile of raw pixels
+    RLE = 2  # tile of runs of count and pixel
+    END = 3  # end of frame
+
+
+def rle_encode(data, output: bytearray) -> None:
+    """Append runs of a count byte then a 16-bit pixel of data to output."""
+    length = len(data)
+    index = 0
+    while index < length:
+        high = data[index]
+        low = data[index + 1]
+        run = 1
+        following = index + 2
+        while (
+            following < length
+            and run < MAX_RUN
+            and data[following] == high
+            and data[following + 1] == low
+        ):
+            run += 1
+            following += 2
+        output.append(run)
+        output.append(high)
+        output.append(low)
+        index = following
+
+
+def rle_decode(data) -> bytearray:
+    """Return pixels of runs of a count byte then a 16-bit pixel."""
+    output = bytearray()
+    for index in range(0, len(data) - 2, 3):
+        output.extend(bytes(data[index + 1 : index + 3]) * data[index])
+    return output
+
+
+def packet(kind: int, payload) -> bytes:
+    """Return packet of type with payload."""
+    return struct.pack(HEADER, SYNC, kind, len(payload), crc32(payload)) + payload
+
+
+class FrameStream:
+    """
+    Stream the display's framebuffer over a UART, sending only changed tiles.
+
+    Tiles are compared with those last sent by their CRC32, and changed
+    tiles are run-length encoded when smaller. Each main loop iteration
+    checks at most one row of tiles, encodes at most one tile, and only
+    writes a chunk once the previous chunk has been transmitted, so the
+    stream never starves command reception. Packets are checksummed, and
+    every few frames all tiles are sent, so a viewer recovers from lost
+    packets.
+    """
+
+    TILE_SIZE = 16
+    PERIOD_MS = 1000
+    CHUNK_SIZE = 64
+    KEYFRAME_INTERVAL = 10
+
+    def __init__(
+        self,
+        display: Display,
+        uart: UART,
+        tile_size: int = TILE_SIZE,
+        period_ms: int = PERIOD_MS,
+        chunk_size: int = CHUNK_SIZE,
+        keyframe_interval: int = KEYFRAME_INTERVAL,
+    ) -> None:
+        """Initialise frame stream instance."""
+        self.display = display
+        self.uart = uart
+        self.tile_size = tile_size
+        self.period_ms = period_ms
+        self.chunk_size = chunk_size
+        self.keyframe_interval = keyframe_interval
+        self.active = False
+        self.frames = 0
+        self.sent = 0
+        self.columns = (display.width + tile_size - 1) // tile_size
+        self.rows = (display.height + tile_size - 1) // tile_size
+        tiles = self.columns * self.rows
+        self._checksums = array("I", [0] * tiles)
+        self._valid = bytearray(tiles)
+        self._pixels = bytearray(tile_size * tile_size * 2)
+        self._source = memoryview(display.buffer)
+        self._pending = b""
+        self._offset = 0
+        self._tile = None
+        self._deadline = utime.ticks_ms()
+
+    def start(self) -> None:
+        """Start streaming, sending a full frame first."""
+        self.refresh()
+        self.active = True
+        self._tile = None
+        self._deadline = utime.ticks_ms()
+
+    def stop(self) -> None:
+        """Stop streaming after discarding any pending data."""
+        self.active = False
+        self._pending = b""
+        self._offset = 0
+
+    def flush(self) -> None:
+        """Write the rest of the current packet, e.g. before another reply."""
+        if self._offset < len(self._pending):
+            self.sent += self.uart.write(self._pending[self._offset :])
+            self._offset = len(self._pending)
+
+    def refresh(self) -> None:
+        """Send all tiles of the next frame."""
+        for index in range(len(self._valid)):
+            self._valid[index] = 0
+
+    def _gather(self, column: int, row: int) -> memoryview:
+        """Return pixels of tile, copied row by row from the framebuffer."""
+        size = self.tile_size
+        width = min(size, self.display.width - column * size) * 2
+        height = min(size, self.display.height - row * size)
+        stride = self.display.width * 2
+        source = (row * size) * stride + column * size * 2
+        pixels = memoryview(self._pixels)
+        for line in range(height):
+            start = source + line * stride
+            pixels[line * width : (line + 1) * width] = self._source[
+                start : start + width
+            ]
+        return pixels[: width * height]
+
+    def _queue(self, kind: int, payload) -> None:
+        """Queue packet for transmission."""
+        self._pending = packet(kind, payload)
+        self._offset = 0
+
+    def _next_tile(self) -> None:
+        """Queue next changed tile, or end of frame once all are checked."""
+        tiles = len(self._valid)
+        for _ in range(self.columns):
+            index = self._tile
+            if index >= tiles:
+                self._tile = None
+                self._queue(Packet.END, struct.pack("<H", self.frames & 0xFFFF))
+                return
+            self._tile += 1
+            row, column = divmod(index, self.columns)
+            pixels = self._gather(column, row)
+            checksum = crc32(pixels)
+            if self._valid[index] and self._checksums[index] == checksum:
+                continue
+            self._checksums[index] = checksum
+            self._valid[index] = 1
+            encoded = bytearray(struct.pack(TILE, column, row))
+            rle_encode(pixels, encoded)
+            if len(encoded) - 2 < len(pixels):
+                self._queue(Packet.RLE, encoded)
+            else:
+                raw = bytearray(struct.pack(TILE, column, row))
+                raw.extend(pixels)
+                self._queue(Packet.RAW, raw)
+            return
+
+    def update(self) -> None:
+        """Send next chunk, or prepare next packet of the stream."""
+        if not self.active:
+            return
+        if self._offset < len(self._pending):
+            if self.uart.txdone():
+                end = self._offset + self.chunk_size
+                self.sent += self.uart.write(self._pending[self._offset : end])
+                self._offset = end
+            return
+        if self._tile is None:
+            now = utime.ticks_ms()
+            if utime.ticks_diff(now, self._deadline) < 0:
+                return
+            self._deadline = utime.ticks_add(now, self.period_ms)
+            self.frames += 1
+            if self.keyframe_interval and not self.frames % self.keyframe_interval:
+                self.refresh()
+            self._tile = 0
+            self._queue(
+                Packet.FRAME,
+                struct.pack(
+                    FRAME,
+                    self.frames & 0xFFFF,
+                    self.display.width,
+                    self.display.height,
+                    self.tile_size,
+                ),
+            )
+            return
+        self._next_tile()
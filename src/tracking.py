@@ -1,4 +1,5 @@
 import rp2
+import utime
 from machine import Pin
 
 
@@ -38,7 +39,20 @@ class Sensors(list):
 
 
 class Tracking:
-    """Class to handle infrared tracking."""
+    """
+    Class to handle infrared tracking.
+
+    In adaptive mode, read_line only scans the sensors around the last line
+    position whilst the line is seen, with a full scan every few reads, or
+    as soon as the line is lost.
+    """
+
+    # State machine cycles per bit clocked to the ADC
+    CYCLES_PER_BIT = 4
+    # Maximum I/O clock of the TLC1543 ADC
+    MAXIMUM_CLOCK_HZ = 2_100_000
+    DEFAULT_FREQUENCY = CYCLES_PER_BIT * 200_000
+    MAXIMUM_FREQUENCY = CYCLES_PER_BIT * MAXIMUM_CLOCK_HZ
 
     def __init__(
         self,
@@ -47,29 +61,102 @@ class Tracking:
         address: Pin = Pin(7, Pin.OUT),
         data: Pin = Pin(27, Pin.IN),
         cs: Pin = Pin(28, Pin.OUT),
+        freq: int = DEFAULT_FREQUENCY,
+        adaptive: bool = False,
+        window: int = 1,
+        full_scan_interval: int = 10,
     ) -> None:
         """Initialise instance and state machine."""
         self.sensors = Sensors(num_sensors)
         self.last_value = 0.0
+        self.adaptive = adaptive
+        self.window = window
+        self.full_scan_interval = full_scan_interval
+        self.on_line = False
+        self._partial_scans = 0
         self.clock = clock
         self.address = address
         self.data = data
         self.cs = cs
         self.cs.on()
+        self.freq = min(freq, self.MAXIMUM_FREQUENCY)
         self.sm = rp2.StateMachine(
             1,
             spi_cpha0,
-            freq=4 * 200000,
+            freq=self.freq,
             sideset_base=self.clock,
             out_base=self.address,
             in_base=self.data,
         )
         self.sm.active(1)
 
-    def analog_read(self) -> list[int]:
+    def set_frequency(self, freq: int) -> None:
+        """Restart state machine at frequency, limited to the ADC's maximum clock."""
+        self.freq = min(freq, self.MAXIMUM_FREQUENCY)
+        self.sm.active(0)
+        self.sm.init(
+            spi_cpha0,
+            freq=self.freq,
+            sideset_base=self.clock,
+            out_base=self.address,
+            in_base=self.data,
+        )
+        self.sm.active(1)
+
+    def _mean_read(self, samples: int) -> list[int]:
+        """Return mean sensor values over samples."""
+        totals = [0] * len(self.sensors)
+        values = [0] * len(self.sensors)
+        for _ in range(samples):
+            self.analog_read(values)
+            for index, value in enumerate(values):
+                totals[index] += value
+        return [total // samples for total in totals]
+
+    def tune(self, samples: int = 8, tolerance: int = 8) -> int:
+        """
+        Set the highest frequency at which readings match the default frequency.
+
+        Frequencies from the ADC's maximum clock are halved until the mean
+        of each sensor is within tolerance of its mean at the default
+        frequency, which is kept if none match. Returns the frequency set.
+        """
+        self.set_frequency(self.DEFAULT_FREQUENCY)
+        reference = self._mean_read(samples)
+        freq = self.MAXIMUM_FREQUENCY
+        while freq > self.DEFAULT_FREQUENCY:
+            self.set_frequency(freq)
+            means = self._mean_read(samples)
+            if all(
+                abs(mean - expected) <= tolerance
+                for mean, expected in zip(means, reference)
+            ):
+                return freq
+            freq //= 2
+        self.set_frequency(self.DEFAULT_FREQUENCY)
+        return self.freq
+
+    def sample_rate(self, reads: int = 100) -> float:
+        """Return measured full scans per second."""
+        values = [0] * len(self.sensors)
+        start = utime.ticks_us()
+        for _ in range(reads):
+            self.analog_read(values)
+        return reads * 1_000_000 / max(1, utime.ticks_diff(utime.ticks_us(), start))
+
+    def analog_read(
+        self,
+        values: list[int] | None = None,
+        first: int = 0,
+        last: int | None = None,
+    ) -> list[int]:
         """
         Read the sensor values and return as a list.
 
+        A preallocated list of values may be given, which is filled and
+        returned to avoid allocating memory. Only sensors from first to last
+        inclusive are read, if given, leaving other values unchanged.
+
         The values returned are a measure of the reflectance in abstract units,
         with higher values corresponding to lower reflectance (e.g. a black
         surface or a void).
@@ -77,16 +164,21 @@ class Tracking:
         The StateMachine returns the value of the last selected channel/sensor,
         e.g. when index = 3, the 2nd sensor value will get appended.
         """
-        values = []
+        if values is None:
+            values = [0] * len(self.sensors)
+        if last is None:
+            last = len(self.sensors) - 1
         # Read each channel AD value
-        for index in range(len(self.sensors) + 1):
+        for index in range(first, last + 2):
             self.cs.off()
             # set channel
             self.sm.put(index << 28)
             # get last channel value
-            values.append((self.sm.get() & 0xFFF) >> 2)
+            value = (self.sm.get() & 0xFFF) >> 2
+            if index > first:
+                values[index - 1] = value
             self.cs.on()
-        return values[1:]
+        return values
 
     def calibrate(self, iterations: int = 10) -> None:
         """
@@ -117,7 +209,12 @@ class Tracking:
             if maximum < sensor.maximum:
                 sensor.maximum = maximum
 
-    def read_calibrated(self):
+    def read_calibrated(
+        self,
+        values: list[int] | None = None,
+        first: int = 0,
+        last: int | None = None,
+    ) -> list[int]:
         """
         Return values calibrated to a value between 0 and 1000.
 
@@ -125,10 +222,16 @@ class Tracking:
         corresponds to the maximum value. Calibration values are
         stored separately for each sensor, so that differences in the
         sensors are accounted for automatically.
+
+        A preallocated list of values and range of sensors may be given, as
+        with analog_read.
         """
         value = 0
-        sensor_values = self.analog_read()
-        for index, value in enumerate(sensor_values):
+        if last is None:
+            last = len(self.sensors) - 1
+        sensor_values = self.analog_read(values, first, last)
+        for index in range(first, last + 1):
+            value = sensor_values[index]
             sensor = self.sensors[index]
             denominator = sensor.maximum - sensor.minimum
             if denominator != 0:
@@ -140,7 +243,7 @@ class Tracking:
             sensor_values[index] = int(value)
         return sensor_values
 
-    def read_line(self, white_line: bool = False):
+    def read_line(self, white_line: bool = False, values: list[int] | None = None):
         """
         Return an estimated position of the robot with respect to a line.
 
@@ -163,12 +266,30 @@ class Tracking:
         by white (low values). If your line is light on black, set the optional
         second argument white_line to true. In this case, each sensor value
         will be replaced by (1000 - value) before averaging.
+
+        A preallocated list of values may be given, as with analog_read. In
+        adaptive mode, values of sensors outside the scanned window are left
+        from the previous read.
         """
+        first, last = 0, len(self.sensors) - 1
+        if (
+            self.adaptive
+            and self.on_line
+            and self._partial_scans < self.full_scan_interval
+        ):
+            # Scan only around the last position, whilst it is reliable
+            nearest = int(self.last_value + 500) // 1000
+            first = max(nearest - self.window, 0)
+            last = min(nearest + self.window, last)
+            self._partial_scans += 1
+        else:
+            self._partial_scans = 0
         avg = 0
         total = 0
         on_line = False
-        sensor_values = self.read_calibrated()
-        for index, value in enumerate(sensor_values):
+        sensor_values = self.read_calibrated(values, first, last)
+        for index in range(first, last + 1):
+            value = sensor_values[index]
             if white_line:
                 value = 1000 - value
             # keep track of whether we see the line at all
@@ -180,6 +301,11 @@ class Tracking:
                 # this is for the weighted total,
                 total += value
                 # this is for the denominator
+        if not on_line and (first or last < len(self.sensors) - 1):
+            # Line lost from the window, so scan all sensors
+            self.on_line = False
+            return self.read_line(white_line, sensor_values)
+        self.on_line = on_line
         if not on_line:
             # If it last read to the left of center, return 0.
             if self.last_value < (len(self.sensors) - 1) * 1000 / 2:
@@ -0,0 +1,190 @@
+"""
+Analyse flight recorder logs copied from a PicoGo.
+
+Log files are memory-mapped as NumPy structured arrays, and the latest run
+is reported by default: loop frequency, loop latency distribution, response
+from each received command to the motor change it caused, and tracking
+error from the centre of the line sensors.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, "src"), os.path.join(ROOT, "sim")]
+
+from flightlog import (  # noqa: E402
+    FIELDS,
+    HEADER_SIZE,
+    NO_DISTANCE,
+    NO_POSITION,
+    RECORD_SIZE,
+    Source,
+    read_header,
+)
+
+DTYPE = np.dtype([(name, "<" + code) for name, code in FIELDS])
+TICKS_PERIOD = 1 << 30
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+def load(paths: list[str], run: int | None = None) -> tuple[int, np.ndarray]:
+    """Return run and its records from log files, in order, using the latest run by default."""
+    logs = []
+    for path in paths:
+        header = read_header(path)
+        if header is None:
+            print(f"Skipping {path}: not a flight log", file=sys.stderr)
+            continue
+        record_size, log_run, sequence = header
+        if record_size != RECORD_SIZE:
+            print(f"Skipping {path}: record size {record_size}", file=sys.stderr)
+            continue
+        logs.append((log_run, sequence, path))
+    if not logs:
+        raise SystemExit("No flight logs found")
+    if run is None:
+        run = max(log_run for log_run, _, _ in logs)
+    arrays = []
+    for log_run, _, path in sorted(logs):
+        if log_run != run:
+            continue
+        count = (os.path.getsize(path) - HEADER_SIZE) // RECORD_SIZE
+        if count > 0:
+            arrays.append(
+                np.memmap(path, DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+            )
+    if not arrays:
+        return run, np.zeros(0, DTYPE)
+    return run, np.concatenate(arrays)
+
+
+def timestamps(records: np.ndarray) -> np.ndarray:
+    """Return microseconds since the first record, unwrapping ticks."""
+    deltas = np.diff(records["time_us"].astype(np.int64)) % TICKS_PERIOD
+    return np.concatenate(([0], np.cumsum(deltas)))
+
+
+def distribution(values: np.ndarray) -> dict:
+    """Return summary statistics of values."""
+    if not len(values):
+        return {"count": 0}
+    summary = {
+        "count": int(len(values)),
+        "mean": float(values.mean()),
+        "std": float(values.std()),
+        "min": float(values.min()),
+        "max": float(values.max()),
+    }
+    for percentile in PERCENTILES:
+        summary[f"p{percentile:g}"] = float(np.percentile(values, percentile))
+    return summary
+
+
+def command_responses(
+    records: np.ndarray, times: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Return iterations and microsecond bound from commands to their motor changes.
+
+    A command and the motor change it causes in the same iteration share a
+    record, so response is only known to loop iteration granularity: the
+    bound runs from the sample before the command's iteration to the sample
+    after the change. Commands without a motor change before the next
+    command are ignored.
+    """
+    outputs = np.stack(
+        (records["left"], records["right"], records["state"]), axis=1
+    ).astype(np.int64)
+    changes = np.flatnonzero(np.any(np.diff(outputs, axis=0), axis=1)) + 1
+    commands = np.flatnonzero(records["source"] != Source.NONE)
+    if not len(commands) or not len(changes):
+        return np.zeros(0), np.zeros(0)
+    # Commands are sampled in the iteration which handled them, so a change
+    # in the same record may be their response
+    following = np.searchsorted(changes, commands, side="left")
+    valid = following < len(changes)
+    commands, following = commands[valid], following[valid]
+    responses = changes[following]
+    next_commands = np.append(commands[1:], np.iinfo(np.int64).max)
+    answered = responses < next_commands
+    commands, responses = commands[answered], responses[answered]
+    iterations = responses - commands
+    bounds = times[responses] - times[commands] + records["loop_us"][commands]
+    return iterations, bounds
+
+
+def analyse(records: np.ndarray, centre: float) -> dict:
+    """Return report of loop timing, command response and tracking error."""
+    if not len(records):
+        return {"records": 0}
+    times = timestamps(records)
+    iterations, bounds = command_responses(records, times)
+    loops = records["loop_us"][1:].astype(np.float64)
+    duration_s = times[-1] / 1_000_000
+    report = {
+        "records": int(len(records)),
+        "duration_s": float(duration_s),
+        "frequency_hz": float(len(loops) / duration_s) if duration_s else 0.0,
+        "loop_us": distribution(loops),
+        "command_response": {
+            "iterations": distribution(iterations.astype(np.float64)),
+            "bound_us": distribution(bounds.astype(np.float64)),
+        },
+        "commands": {
+            "bluetooth": int(np.count_nonzero(records["source"] == Source.BLUETOOTH)),
+            "remote": int(np.count_nonzero(records["source"] == Source.REMOTE)),
+        },
+    }
+    positions = records["position"]
+    tracked = positions != NO_POSITION
+    error = positions[tracked].astype(np.float64) - centre
+    report["tracking_error"] = distribution(np.abs(error))
+    if len(error):
+        report["tracking_error"]["rms"] = float(np.sqrt(np.mean(error**2)))
+    distances = records["distance_mm"]
+    report["distance_mm"] = distribution(
+        distances[distances != NO_DISTANCE].astype(np.float64)
+    )
+    # Conversion matches sensors.Battery.voltage
+    volts = records["battery"].astype(np.float64) * 3.3 / 65535 * 2
+    report["battery_v"] = {"min": float(volts.min()), "max": float(volts.max())}
+    return report
+
+
+def main() -> int:
+    """Report analysis of flight logs as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("logs", nargs="+", help="flight log files")
+    parser.add_argument("-r", "--run", type=int, help="run to analyse")
+    parser.add_argument(
+        "-c",
+        "--centre",
+        type=float,
+        default=2000,
+        help="line position at the centre of the sensors",
+    )
+    parser.add_argument("-o", "--output", help="write records of run as CSV")
+    args = parser.parse_args()
+
+    run, records = load(args.logs, args.run)
+    if args.output:
+        np.savetxt(
+            args.output,
+            records,
+            delimiter=",",
+            fmt="%d",
+            header=",".join(DTYPE.names),
+            comments="",
+        )
+    report = {"run": run, **analyse(records, args.centre)}
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
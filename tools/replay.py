@@ -0,0 +1,71 @@
+"""
+Replay a recorded input trace through PicoGo on the host.
+
+The main loop runs against simulated peripherals on a virtual clock, so
+replays are deterministic. Outputs are compared against those recorded in
+the trace, and latencies from each command to its motor change are reported.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, "src"), os.path.join(ROOT, "sim")]
+
+import peripherals  # noqa: E402
+import utime  # noqa: E402
+from board import PicoGo  # noqa: E402
+from replay import Player, compare, latencies, read_trace, write_trace  # noqa: E402
+
+
+def summarise(values: list[int]) -> dict:
+    """Return summary of latencies in microseconds."""
+    if not values:
+        return {"count": 0}
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "min": values[0],
+        "median": values[len(values) // 2],
+        "p99": values[min(len(values) - 1, len(values) * 99 // 100)],
+        "max": values[-1],
+    }
+
+
+def replay(records: list[tuple[int, int, bytes]]) -> list[tuple[int, int, bytes]]:
+    """Replay records through a simulated PicoGo, returning the resulting trace."""
+    peripherals.reset()
+    utime.clock.set_virtual()
+    board = PicoGo()
+    player = Player(records)
+    player.attach(board)
+    board.start()
+    return player.trace()
+
+
+def main() -> int:
+    """Replay trace, returning non-zero exit status if outputs differ."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("trace", help="recorded trace file")
+    parser.add_argument("-o", "--output", help="write replayed trace to file")
+    args = parser.parse_args()
+
+    recorded = read_trace(args.trace)
+    replayed = replay(recorded)
+    if args.output:
+        write_trace(args.output, replayed)
+    report = {
+        "comparison": compare(recorded, replayed),
+        "latency": {
+            "recorded": summarise(latencies(recorded)),
+            "replayed": summarise(latencies(replayed)),
+        },
+    }
+    print(json.dumps(report, indent=2))
+    return 0 if report["comparison"]["match"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+"""
+Run software-in-the-loop scenarios of PicoGo in a simulated world on the host.
+
+The main loop runs against a world model on a virtual clock, so scenarios
+run faster than real time and are reproducible from their seeds. Each run
+randomises its starting conditions, and statistics are reported across all
+runs, e.g. lap times and tracking error of a line follower, or braking
+distance before an obstacle.
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+from functools import partial
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, "src"), os.path.join(ROOT, "sim")]
+
+import peripherals  # noqa: E402
+import utime  # noqa: E402
+from board import PicoGo  # noqa: E402
+from motor import DriveState  # noqa: E402
+from tracking import Tracking  # noqa: E402
+from world import Robot, Track, Wall, World  # noqa: E402
+
+SAMPLE_US = 10_000
+_tracks = {}
+
+
+class LineFollower:
+    """Proportional-derivative line follower, steering each side with Drive.arc."""
+
+    def __init__(
+        self,
+        tracking: Tracking,
+        speed: float = 40,
+        kp: float = 0.02,
+        kd: float = 0.5,
+        white_line: bool = False,
+    ) -> None:
+        """Initialise line follower."""
+        self.tracking = tracking
+        self.speed = speed
+        self.kp = kp
+        self.kd = kd
+        self.white_line = white_line
+        self.centre = (len(tracking.sensors) - 1) * 1000 / 2
+        self._values = [0] * len(tracking.sensors)
+        self._error = 0.0
+        self._time = utime.ticks_us()
+
+    def update(self, board: PicoGo) -> None:
+        """Steer towards line, with derivative of error per millisecond."""
+        position, _ = self.tracking.read_line(self.white_line, self._values)
+        now = utime.ticks_us()
+        elapsed_ms = max(utime.ticks_diff(now, self._time), 1) / 1000
+        error = position - self.centre
+        turn = self.kp * error + self.kd * (error - self._error) / elapsed_ms
+        self._error = error
+        self._time = now
+        board.drive.arc(self.speed + turn, self.speed - turn)
+
+
+def oval() -> Track:
+    """Return oval track, built once per process."""
+    if "oval" not in _tracks:
+        _tracks["oval"] = Track.oval()
+    return _tracks["oval"]
+
+
+def _setup() -> None:
+    """Reset simulated peripherals and use the virtual clock."""
+    peripherals.reset()
+    utime.clock.set_virtual()
+
+
+def _every(period_us: int, callback: callable) -> callable:
+    """Return main loop callback, calling callback at most once per period."""
+    state = {"deadline": utime.clock.now()}
+
+    def sampled(board: PicoGo) -> None:
+        now = utime.clock.now()
+        if now >= state["deadline"]:
+            state["deadline"] = now + period_us
+            callback(board)
+
+    return sampled
+
+
+def lap(
+    seed: int,
+    laps: int = 1,
+    speed: float = 40,
+    kp: float = 0.02,
+    kd: float = 0.5,
+    noise: float = 10.0,
+    timeout_s: float = 60.0,
+) -> dict:
+    """Follow an oval line for a number of laps, from a randomised start."""
+    _setup()
+    rng = random.Random(seed)
+    track = oval()
+    path = track.paths[0]
+    # Start on the straight which closes the oval, heading along it
+    (x1, y1), (x2, _) = path.points[-2], path.points[-1]
+    robot = Robot(
+        x1 + (x2 - x1) * rng.uniform(0.2, 0.4) - Robot.TRACKING_OFFSET_MM,
+        y1 + rng.uniform(-5, 5),
+        rng.uniform(-0.1, 0.1),
+    )
+    world = World(robot, track, noise=noise, seed=seed)
+    board = PicoGo()
+    tracking = Tracking()
+    world.attach()
+    follower = LineFollower(tracking, speed, kp, kd)
+    start = utime.clock.now()
+    state = {"progress": 0.0, "along": None, "errors": [], "lost_us": 0}
+    result = {"seed": seed, "completed": False, "derailed": False}
+
+    def sample(board: PicoGo) -> None:
+        world.update(exact=True)
+        along, error = path.project(*robot.point(Robot.TRACKING_OFFSET_MM))
+        if state["along"] is not None:
+            delta = along - state["along"]
+            if delta < -path.length / 2:
+                delta += path.length
+            elif delta > path.length / 2:
+                delta -= path.length
+            state["progress"] += delta
+        state["along"] = along
+        state["errors"].append(error)
+        elapsed = utime.clock.now() - start
+        # Derailed once far from the line for over a second
+        state["lost_us"] = state["lost_us"] + SAMPLE_US if error > 100 else 0
+        if state["progress"] >= laps * path.length:
+            result["completed"] = True
+            result["lap_time_s"] = elapsed / 1_000_000 / laps
+            board.stop()
+        elif state["lost_us"] > 1_000_000:
+            result["derailed"] = True
+            board.stop()
+        elif elapsed > timeout_s * 1_000_000:
+            board.stop()
+
+    board.add_callback("follower", follower.update)
+    board.add_callback("scenario", _every(SAMPLE_US, sample))
+    board.start()
+    errors = state["errors"]
+    result["error_mm"] = {
+        "mean": sum(errors) / len(errors),
+        "rms": math.sqrt(sum(error * error for error in errors) / len(errors)),
+        "max": max(errors),
+    }
+    result["laps"] = state["progress"] / path.length
+    return result
+
+
+def brake(
+    seed: int,
+    speed: float = 60,
+    governor: bool = False,
+    noise: float = 10.0,
+    timeout_s: float = 20.0,
+) -> dict:
+    """Drive towards a wall from a randomised distance, until stopping."""
+    _setup()
+    rng = random.Random(seed)
+    distance = rng.uniform(400, 1500)
+    robot = Robot(0.0, 0.0, rng.uniform(-0.05, 0.05))
+    wall = Wall(distance + Robot.RADIUS_MM, -1000, distance + Robot.RADIUS_MM, 1000)
+    world = World(robot, obstacles=(wall,), noise=noise, seed=seed)
+    board = PicoGo(governor=governor)
+    world.attach()
+    board.drive.speed = speed
+    board.drive.forward()
+    start = utime.clock.now()
+    state = {"braked": None, "odometer": 0.0, "rest_us": 0}
+    result = {"seed": seed, "distance_mm": distance, "collided": False}
+
+    def sample(board: PicoGo) -> None:
+        world.update(exact=True)
+        elapsed = utime.clock.now() - start
+        if state["braked"] is None and board.drive.state == DriveState.BRAKE:
+            state["braked"] = elapsed
+            state["odometer"] = robot.odometer_mm
+        # Stopped once at rest for 200ms
+        state["rest_us"] = (
+            state["rest_us"] + SAMPLE_US if abs(robot.speed_mm_s) < 1 else 0
+        )
+        if world.collided or state["rest_us"] > 200_000 or elapsed > timeout_s * 1e6:
+            board.stop()
+
+    board.add_callback("scenario", _every(SAMPLE_US, sample))
+    board.start()
+    result["collided"] = world.collided
+    result["clearance_mm"] = max(world.clearance_mm(), 0.0)
+    if state["braked"] is not None:
+        result["braking_distance_mm"] = robot.odometer_mm - state["odometer"]
+        result["brake_time_s"] = state["braked"] / 1_000_000
+    return result
+
+
+SCENARIOS = {"lap": lap, "brake": brake}
+
+
+def summarise(values: list[float]) -> dict:
+    """Return summary statistics of values."""
+    if not values:
+        return {"count": 0}
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values),
+        "min": values[0],
+        "median": values[len(values) // 2],
+        "p90": values[min(len(values) - 1, len(values) * 9 // 10)],
+        "max": values[-1],
+    }
+
+
+def summary(results: list[dict]) -> dict:
+    """Return statistics of numeric and boolean results across runs."""
+    report = {}
+    keys = {key for result in results for key in result if key != "seed"}
+    for key in sorted(keys):
+        values = [result[key] for result in results if key in result]
+        if all(isinstance(value, bool) for value in values):
+            report[key] = sum(values) / len(results)
+        elif all(isinstance(value, dict) for value in values):
+            report[key] = {
+                name: summarise([value[name] for value in values]) for name in values[0]
+            }
+        else:
+            report[key] = summarise(values)
+    return report
+
+
+def main() -> int:
+    """Run scenario across seeds, reporting statistics as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("scenario", choices=sorted(SCENARIOS))
+    parser.add_argument("-n", "--runs", type=int, default=10, help="number of runs")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="first seed")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="parallel runs")
+    parser.add_argument(
+        "-p",
+        "--parameter",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="scenario parameter, e.g. speed=50",
+    )
+    parser.add_argument("-o", "--output", help="write results of each run as JSON")
+    args = parser.parse_args()
+
+    parameters = {}
+    for parameter in args.parameter:
+        name, _, value = parameter.partition("=")
+        parameters[name] = json.loads(value)
+    scenario = partial(SCENARIOS[args.scenario], **parameters)
+    seeds = range(args.seed, args.seed + args.runs)
+    if args.jobs > 1:
+        with multiprocessing.Pool(args.jobs) as pool:
+            results = pool.map(scenario, seeds)
+    else:
+        results = [scenario(seed) for seed in seeds]
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    report = {
+        "scenario": args.scenario,
+        "parameters": parameters,
+        "runs": len(results),
+        "summary": summary(results),
+    }
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""
+View the display of a PicoGo streamed over Bluetooth.
+
+Stream packets are read from a serial port, which requires pyserial, or
+from a captured file, and decoded into a copy of the framebuffer. Each
+complete frame is written as a PPM image.
+"""
+
+import argparse
+import os
+import struct
+import sys
+from binascii import crc32
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, "src"), os.path.join(ROOT, "sim")]
+
+from stream import (  # noqa: E402
+    FRAME,
+    HEADER,
+    HEADER_SIZE,
+    SYNC,
+    TILE,
+    Packet,
+    rle_decode,
+)
+
+try:
+    import serial
+except ImportError:
+    serial = None
+
+
+class Decoder:
+    """Decode stream packets into a framebuffer, skipping corrupt packets."""
+
+    def __init__(self) -> None:
+        """Initialise decoder."""
+        self.width = 0
+        self.height = 0
+        self.tile_size = 0
+        self.frame = None
+        self.framebuffer = bytearray()
+        self.tiles = 0
+        self.corrupt = 0
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> list[int]:
+        """Decode data, returning numbers of frames completed."""
+        self._buffer.extend(data)
+        completed = []
+        while True:
+            start = self._buffer.find(SYNC)
+            if start < 0:
+                # Keep a trailing partial sync
+                del self._buffer[: max(len(self._buffer) - 1, 0)]
+                return completed
+            del self._buffer[:start]
+            if len(self._buffer) < HEADER_SIZE:
+                return completed
+            _, kind, length, checksum = struct.unpack(
+                HEADER, self._buffer[:HEADER_SIZE]
+            )
+            if len(self._buffer) < HEADER_SIZE + length:
+                return completed
+            payload = bytes(self._buffer[HEADER_SIZE : HEADER_SIZE + length])
+            if crc32(payload) != checksum:
+                # Resynchronise after the sync bytes
+                self.corrupt += 1
+                del self._buffer[: len(SYNC)]
+                continue
+            del self._buffer[: HEADER_SIZE + length]
+            if self._handle(kind, payload):
+                completed.append(self.frame)
+
+    def _handle(self, kind: int, payload: bytes) -> bool:
+        """Apply packet, returning whether a frame was completed."""
+        if kind == Packet.FRAME:
+            self.frame, width, height, self.tile_size = struct.unpack(FRAME, payload)
+            if (width, height) != (self.width, self.height):
+                self.width, self.height = width, height
+                self.framebuffer = bytearray(width * height * 2)
+        elif kind in (Packet.RAW, Packet.RLE) and self.framebuffer:
+            column, row = struct.unpack(TILE, payload[:2])
+            pixels = payload[2:] if kind == Packet.RAW else rle_decode(payload[2:])
+            self._blit(column, row, pixels)
+            self.tiles += 1
+        elif kind == Packet.END:
+            return self.frame is not None
+        return False
+
+    def _blit(self, column: int, row: int, pixels: bytes) -> None:
+        """Copy pixels of tile into framebuffer."""
+        size = self.tile_size
+        width = min(size, self.width - column * size) * 2
+        height = min(size, self.height - row * size)
+        stride = self.width * 2
+        source = (row * size) * stride + column * size * 2
+        for line in range(height):
+            start = source + line * stride
+            self.framebuffer[start : start + width] = pixels[
+                line * width : (line + 1) * width
+            ]
+
+    def rgb(self) -> bytes:
+        """Return framebuffer as 24-bit RGB, from panel-native RGB565."""
+        data = self.framebuffer
+        output = bytearray(self.width * self.height * 3)
+        for index in range(self.width * self.height):
+            value = (data[index * 2] << 8) | data[index * 2 + 1]
+            red, green, blue = value >> 11, (value >> 5) & 0x3F, value & 0x1F
+            output[index * 3] = (red << 3) | (red >> 2)
+            output[index * 3 + 1] = (green << 2) | (green >> 4)
+            output[index * 3 + 2] = (blue << 3) | (blue >> 2)
+        return bytes(output)
+
+    def save_ppm(self, path: str) -> None:
+        """Save framebuffer as a binary PPM image."""
+        with open(path, "wb") as file:
+            file.write(f"P6\n{self.width} {self.height}\n255\n".encode())
+            file.write(self.rgb())
+
+
+def main() -> int:
+    """Decode stream into PPM images of each frame."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("source", help="serial port, or file of captured stream")
+    parser.add_argument("-b", "--baudrate", type=int, default=115200)
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="frame.ppm",
+        help="image path, with %%d replaced by frame number if present",
+    )
+    args = parser.parse_args()
+
+    decoder = Decoder()
+
+    def save(frames: list[int]) -> None:
+        for frame in frames:
+            path = args.output % frame if "%d" in args.output else args.output
+            decoder.save_ppm(path)
+            print(f"Frame {frame}: {decoder.tiles} tiles -> {path}", file=sys.stderr)
+
+    if os.path.isfile(args.source):
+        with open(args.source, "rb") as file:
+            save(decoder.feed(file.read()))
+        return 0
+    if serial is None:
+        raise SystemExit("Reading from a serial port requires pyserial")
+    with serial.Serial(args.source, args.baudrate, timeout=0.1) as port:
+        port.write(b'{"stream": "start"}')
+        try:
+            while True:
+                save(decoder.feed(port.read(4096)))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            port.write(b'{"stream": "stop"}')
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())